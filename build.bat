@@ -31,6 +31,7 @@ pyinstaller --clean ^
     --onefile ^
     --windowed ^
     --name PAPIWEB_Editor_GUI ^
+    --add-data "palabras_es.txt.gz;." ^
     papiweb_editor.py
 
 REM Construir versión Consola
@@ -39,14 +40,19 @@ echo Construyendo PAPIWEB Editor Console...
 pyinstaller --clean ^
     --onefile ^
     --name PAPIWEB_Editor_Console ^
+    --add-data "palabras_es.txt.gz;." ^
     papiweb_editor_console.py
 
+REM Atribución de la lista de palabras incluida (ver NOTICE)
+copy /Y NOTICE dist\NOTICE.txt >nul
+
 echo.
 echo ================================================
 echo Construcción completada!
 echo Los ejecutables se encuentran en la carpeta 'dist':
 echo - PAPIWEB_Editor_GUI.exe
 echo - PAPIWEB_Editor_Console.exe
+echo - NOTICE.txt (licencias de terceros)
 echo ================================================
 
 REM Desactivar entorno virtual
@@ -0,0 +1,87 @@
+import re
+from collections import deque
+
+from papiweb_matcher import PhraseMatcher
+from papiweb_styles import WRITING_STYLES
+
+# Palabras y signos de fin de oración en una sola expresión: el texto se
+# recorre una única vez para estadísticas, ortografía y estilo
+WORD_RE = re.compile(r'\b\w+\b')
+TOKEN_RE = re.compile(r'\w+|[.!?]+')
+
+# Un autómata por estilo, construido la primera vez que se usa
+_style_matchers = {}
+
+
+def get_style_matcher(writing_style):
+    matcher = _style_matchers.get(writing_style)
+    if matcher is None:
+        phrases = WRITING_STYLES.get(writing_style, {}).get("phrases", {})
+        matcher = _style_matchers[writing_style] = PhraseMatcher(phrases)
+    return matcher
+
+
+def analyze_text(text, spelling_errors, writing_style=None):
+    spelling_hits = []
+    style_hits = []
+    sentence_lengths = []
+    word_tokens = 0
+    sentence_words = 0
+
+    matcher = get_style_matcher(writing_style)
+    goto = matcher.goto
+    output = matcher.output
+    recent_starts = deque(maxlen=max(matcher.max_words, 1))
+    state = 0
+
+    for match in TOKEN_RE.finditer(text):
+        token = match.group()
+        if token[0] in ".!?":
+            if sentence_words:
+                sentence_lengths.append(sentence_words)
+                sentence_words = 0
+            # Las frases de estilo no cruzan el final de una oración
+            state = 0
+            continue
+
+        word_tokens += 1
+        sentence_words += 1
+        word = token.lower()
+        # Una sola consulta por palabra: el diccionario puede estar en disco
+        suggestion = spelling_errors.get(word)
+        if suggestion is not None:
+            spelling_hits.append((match.start(), match.end(), token, suggestion))
+
+        if goto[0]:
+            recent_starts.append(match.start())
+            if state or word in goto[0]:
+                state = matcher.step(state, word)
+                for phrase, length in output[state]:
+                    style_hits.append((recent_starts[-length], match.end(), phrase))
+
+    if sentence_words:
+        sentence_lengths.append(sentence_words)
+
+    found = {phrase for _, _, phrase in style_hits}
+    phrases = WRITING_STYLES.get(writing_style, {}).get("phrases", {})
+
+    return {
+        "words": len(text.split()),
+        "characters": len(text),
+        "paragraphs": sum(1 for line in text.split('\n') if line.strip()),
+        "sentences": len(sentence_lengths),
+        "sentence_lengths": sentence_lengths,
+        "avg_sentence_length": word_tokens / max(len(sentence_lengths), 1),
+        "spelling_hits": spelling_hits,
+        "style_hits": style_hits,
+        "style_findings": [phrase for phrase in phrases if phrase in found],
+    }
+
+
+def count_spelling_errors(text, spelling_errors):
+    return sum(1 for word in WORD_RE.findall(text.lower()) if word in spelling_errors)
+
+
+def style_message(writing_style, phrase):
+    style = WRITING_STYLES[writing_style]
+    return style["message"].format(phrase, style["phrases"][phrase])
@@ -0,0 +1,76 @@
+from papiweb_analysis import WORD_RE
+from papiweb_dictionary import CONTEXT_DEPENDENT
+
+# Corrección automática con el diccionario de errores: una sola pasada de
+# WORD_RE.sub sobre el texto, con una consulta al diccionario por palabra.
+# Las entradas con varias opciones ("ahí/hay/¡ay!") y las que dependen del
+# contexto sólo se aplican si el usuario eligió qué poner.
+
+
+def correction_options(word, suggestion):
+    # Opciones para una entrada ambigua, o None si se puede aplicar sola
+    if "/" in suggestion:
+        return suggestion.split("/")
+    if word in CONTEXT_DEPENDENT:
+        return [suggestion]
+    return None
+
+
+def find_ambiguous(text, spelling_errors):
+    # Palabras del texto que necesitan una elección: palabra -> (opciones, apariciones)
+    found = {}
+    for match in WORD_RE.finditer(text):
+        word = match.group().lower()
+        entry = found.get(word)
+        if entry is not None:
+            entry[1] += 1
+            continue
+        suggestion = spelling_errors.get(word)
+        if suggestion is not None:
+            options = correction_options(word, suggestion)
+            if options is not None:
+                found[word] = [options, 1]
+    return {word: (options, count) for word, (options, count) in found.items()}
+
+
+def match_case(original, replacement):
+    # "Aver" -> "A ver", "AVER" -> "A VER"; el resto se deja en minúsculas
+    if len(original) > 1 and original.isupper():
+        return replacement.upper()
+    if original[0].isupper():
+        for i, char in enumerate(replacement):
+            if char.isalpha():
+                return replacement[:i] + char.upper() + replacement[i + 1:]
+    return replacement
+
+
+def apply_corrections(text, spelling_errors, choices=None):
+    # choices: palabra -> corrección elegida para las ambiguas ("" o ausente
+    # = dejar igual). Devuelve (texto nuevo, correcciones, inicio de la
+    # primera, fin de la última), como SearchQuery.replace_all.
+    choices = choices or {}
+    corrected = {}   # palabra tal como aparece -> reemplazo (o ella misma)
+    spans = []
+
+    def correct(token):
+        word = token.lower()
+        if word in choices:
+            return match_case(token, choices[word]) if choices[word] else token
+        suggestion = spelling_errors.get(word)
+        if suggestion is None or suggestion == word or correction_options(word, suggestion):
+            return token
+        return match_case(token, suggestion)
+
+    def substitute(match):
+        token = match.group()
+        replacement = corrected.get(token)
+        if replacement is None:
+            replacement = corrected[token] = correct(token)
+        if replacement != token:
+            spans.append(match.span())
+        return replacement
+
+    new_text = WORD_RE.sub(substitute, text)
+    if not spans:
+        return text, 0, None, None
+    return new_text, len(spans), spans[0][0], spans[-1][1]
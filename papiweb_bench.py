@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from papiweb_analysis import analyze_text, count_spelling_errors
+from papiweb_dictionary import DEFAULT_SPELLING_ERRORS
+from papiweb_io import atomic_write_text
+from papiweb_styles import WRITING_STYLES
+
+# Banco de pruebas de los caminos más usados del editor sobre texto sintético
+# en español. Los resultados se guardan en JSON y se comparan contra una línea
+# base guardada en la misma máquina.
+DEFAULT_SIZES = "1K,100K,1M,10M"
+# La exportación/importación PDF es mucho más lenta: se limita a estos tamaños
+DEFAULT_PDF_MAX = "1M"
+BASELINE_PATH = os.path.join(os.path.expanduser("~"), ".papiweb", "bench_baseline.json")
+# Una medición se marca como regresión si tarda más que la base por este factor
+DEFAULT_THRESHOLD = 1.15
+# ...y además por al menos esta diferencia absoluta (evita ruido en tiempos chicos)
+MIN_DELTA_SECONDS = 0.002
+
+VOCABULARY = (
+    "el la los las un una de del en con por para sin sobre entre hacia desde "
+    "que como cuando donde porque aunque si pero y o también después entonces "
+    "casa escuela trabajo ciudad país mundo tiempo día noche año semana mañana "
+    "gente persona amigo familia madre padre hijo hija profesor alumno equipo "
+    "proyecto programa sistema problema idea historia libro texto palabra "
+    "pregunta respuesta ejemplo forma parte lugar momento manera cosa vida "
+    "es son fue era está están tiene tienen hace hacen puede pueden dice dicen "
+    "quiere necesita sabe piensa llega sale vuelve trabaja estudia escribe lee "
+    "bueno buena nuevo nueva grande pequeño largo corto fácil difícil claro "
+    "importante necesario posible general mejor peor primero último otro mismo "
+    "siempre nunca hoy ayer todavía ya muy más menos bastante poco mucho todo"
+).split()
+# Proporción de palabras reemplazadas por errores y frases de estilo
+ERROR_RATE = 0.02
+STYLE_RATE = 0.01
+
+
+def parse_size(text):
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper()
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def size_label(size):
+    for unit, factor in (("G", 1024 ** 3), ("M", 1024 ** 2), ("K", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return str(size)
+
+
+def generate_text(size, seed=0):
+    # Texto determinista de aproximadamente size bytes en UTF-8: oraciones de
+    # 5 a 25 palabras, párrafos de 3 a 8 oraciones, con errores del
+    # diccionario y frases de los estilos mezclados al azar
+    rng = random.Random(seed)
+    errors = sorted(DEFAULT_SPELLING_ERRORS)
+    phrases = sorted({phrase for style in WRITING_STYLES.values() for phrase in style["phrases"]})
+    paragraphs = []
+    written = 0
+    while written < size:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            words = []
+            for _ in range(rng.randint(5, 25)):
+                roll = rng.random()
+                if roll < ERROR_RATE:
+                    words.append(rng.choice(errors))
+                elif roll < ERROR_RATE + STYLE_RATE:
+                    words.append(rng.choice(phrases))
+                else:
+                    words.append(rng.choice(VOCABULARY))
+            sentence = " ".join(words)
+            sentences.append(sentence[0].upper() + sentence[1:] + rng.choice(".....?!"))
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        written += len(paragraph.encode("utf-8")) + 1
+    text = "\n".join(paragraphs)
+    return text.encode("utf-8")[:size].decode("utf-8", errors="ignore")
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_size(text, workdir, repeat, include_pdf, pdf_workers):
+    results = {}
+    results["count_spelling_errors"] = best_time(
+        lambda: count_spelling_errors(text, DEFAULT_SPELLING_ERRORS), repeat)
+    # update_stats y analyze_style leen de la misma pasada de analyze_text
+    results["update_stats"] = best_time(
+        lambda: analyze_text(text, DEFAULT_SPELLING_ERRORS), repeat)
+    results["analyze_style"] = best_time(
+        lambda: analyze_text(text, DEFAULT_SPELLING_ERRORS, "universitario"), repeat)
+
+    path = os.path.join(workdir, "documento.txt")
+    results["save_text"] = best_time(lambda: atomic_write_text(path, text), repeat)
+
+    def open_text():
+        with open(path, "r", encoding="utf-8") as f:
+            f.read()
+
+    results["open_text"] = best_time(open_text, repeat)
+
+    def open_large_file():
+        from papiweb_largefile import LineIndex
+        index = LineIndex(path)
+        index.start()
+        if index.thread is not None:
+            index.thread.join()
+        index.get_lines(index.line_count() // 2, 2000)
+        index.close()
+
+    results["open_large_file"] = best_time(open_large_file, repeat)
+
+    if include_pdf:
+        from papiweb_pdf import export_text_to_pdf, extract_pdf_text
+        pdf_path = os.path.join(workdir, "documento.pdf")
+        results["pdf_export"] = best_time(lambda: export_text_to_pdf(text, pdf_path), repeat)
+        results["pdf_import"] = best_time(lambda: extract_pdf_text(pdf_path), repeat)
+        if pdf_workers > 1:
+            results["pdf_import_parallel"] = best_time(
+                lambda: extract_pdf_text(pdf_path, workers=pdf_workers), repeat)
+    return results
+
+
+def run_benchmarks(sizes, pdf_max, repeat, seed, pdf_workers, progress=None):
+    from importlib.util import find_spec
+    pdf_available = find_spec("pdfplumber") is not None and find_spec("reportlab") is not None
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": seed,
+            "repeat": repeat,
+            "pdf": pdf_available,
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="papiweb_bench_") as workdir:
+        for size in sizes:
+            label = size_label(size)
+            text = generate_text(size, seed)
+            # Los tamaños grandes se miden una sola vez
+            times = repeat if size <= 1024 ** 2 else 1
+            include_pdf = pdf_available and size <= pdf_max
+            results = bench_size(text, workdir, times, include_pdf, pdf_workers)
+            for name, seconds in results.items():
+                report["results"].setdefault(name, {})[label] = {
+                    "seconds": round(seconds, 6),
+                    "mb_per_s": round(size / 1024 ** 2 / seconds, 2) if seconds else None,
+                }
+            if progress is not None:
+                progress(label, results)
+    return report
+
+
+def compare(report, baseline, threshold):
+    # Devuelve filas (benchmark, tamaño, base, actual, cociente, regresión)
+    rows = []
+    for name, by_size in report["results"].items():
+        for label, current in by_size.items():
+            previous = baseline.get("results", {}).get(name, {}).get(label)
+            if previous is None:
+                continue
+            ratio = current["seconds"] / previous["seconds"] if previous["seconds"] else 1.0
+            regression = (ratio > threshold
+                          and current["seconds"] - previous["seconds"] > MIN_DELTA_SECONDS)
+            rows.append((name, label, previous["seconds"], current["seconds"], ratio, regression))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="papiweb_bench",
+        description="Banco de pruebas de Papiweb Editor sobre texto sintético en español.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"tamaños separados por coma, p. ej. 1K,1M,100M (por defecto {DEFAULT_SIZES})")
+    parser.add_argument("--pdf-max", default=DEFAULT_PDF_MAX,
+                        help=f"tamaño máximo para medir PDF (por defecto {DEFAULT_PDF_MAX})")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="repeticiones por medición hasta 1M; se toma la mejor")
+    parser.add_argument("--seed", type=int, default=0, help="semilla del generador de texto")
+    parser.add_argument("--pdf-workers", type=int, default=os.cpu_count() or 1,
+                        help="procesos para la importación PDF en paralelo")
+    parser.add_argument("--output", help="archivo JSON con los resultados (por defecto, stdout)")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_PATH,
+                        help=f"comparar contra una línea base (por defecto {BASELINE_PATH})")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH,
+                        help="guardar los resultados como nueva línea base")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="cociente actual/base a partir del cual se marca una regresión")
+    parser.add_argument("--generate", metavar="ARCHIVO",
+                        help="sólo escribir el texto del primer tamaño en ARCHIVO y salir")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    if args.generate:
+        atomic_write_text(args.generate, generate_text(sizes[0], args.seed))
+        return 0
+
+    def progress(label, results):
+        timings = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in results.items())
+        print(f"[{label}] {timings}", file=sys.stderr, flush=True)
+
+    report = run_benchmarks(sizes, parse_size(args.pdf_max), args.repeat, args.seed,
+                            args.pdf_workers, progress)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        atomic_write_text(args.output, text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        atomic_write_text(args.save_baseline, text + "\n")
+        print(f"Línea base guardada en {args.save_baseline}", file=sys.stderr)
+
+    if not args.baseline:
+        return 0
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo leer la línea base: {e}", file=sys.stderr)
+        return 2
+    rows = compare(report, baseline, args.threshold)
+    regressions = 0
+    print(f"\n{'benchmark':<24}{'tamaño':>8}{'base (ms)':>12}{'actual (ms)':>13}{'cociente':>10}",
+          file=sys.stderr)
+    for name, label, previous, current, ratio, regression in rows:
+        regressions += regression
+        flag = "  REGRESIÓN" if regression else ""
+        print(f"{name:<24}{label:>8}{previous * 1000:12.1f}{current * 1000:13.1f}{ratio:10.2f}{flag}",
+              file=sys.stderr)
+    print(f"\n{regressions} regresión(es) sobre {len(rows)} mediciones "
+          f"(umbral x{args.threshold:.2f})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    # Necesario para la importación PDF en paralelo en los ejecutables de PyInstaller
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import json
+import os
+from collections import Counter
+
+from papiweb_analysis import analyze_text
+from papiweb_io import read_document
+
+CORPUS_EXTENSIONS = (".txt", ".pdf")
+# Ancho (en palabras) de cada barra del histograma de largo de oraciones
+SENTENCE_BIN_WORDS = 5
+# Tareas en vuelo por proceso: acota la memoria con corpus de decenas de miles
+IN_FLIGHT_PER_WORKER = 8
+
+_worker_spelling_errors = None
+_worker_style = None
+
+
+def walk_corpus(root):
+    for directory, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(CORPUS_EXTENSIONS):
+                yield os.path.relpath(os.path.join(directory, name), root)
+
+
+def sentence_bin(length):
+    low = (length // SENTENCE_BIN_WORDS) * SENTENCE_BIN_WORDS
+    return f"{low}-{low + SENTENCE_BIN_WORDS - 1}"
+
+
+def _init_worker(spelling_errors, writing_style):
+    global _worker_spelling_errors, _worker_style
+    _worker_spelling_errors = spelling_errors
+    _worker_style = writing_style
+
+
+def analyze_corpus_file(root, relpath, size, mtime_ns):
+    # Fase "map": corre en un proceso del pool y devuelve sólo conteos
+    record = {"file": relpath, "size": size, "mtime_ns": mtime_ns}
+    try:
+        analysis = analyze_text(read_document(os.path.join(root, relpath)),
+                                _worker_spelling_errors, _worker_style)
+    except Exception as e:
+        record["error"] = str(e)
+        return record
+    record["words"] = analysis["words"]
+    record["errors"] = dict(Counter(word.lower() for _, _, word, _ in analysis["spelling_hits"]))
+    record["style"] = dict(Counter(phrase for _, _, phrase in analysis["style_hits"]))
+    record["sentences"] = dict(Counter(sentence_bin(n) for n in analysis["sentence_lengths"]))
+    return record
+
+
+class CorpusReport:
+    # Fase "reduce": acumula los conteos de cada archivo en un solo informe
+    def __init__(self, root, writing_style):
+        self.root = root
+        self.writing_style = writing_style
+        self.files = 0
+        self.failed = []
+        self.words = 0
+        self.errors = Counter()
+        self.style = Counter()
+        self.sentences = Counter()
+
+    def add(self, record):
+        self.files += 1
+        if "error" in record:
+            self.failed.append({"file": record["file"], "error": record["error"]})
+            return
+        self.words += record["words"]
+        self.errors.update(record["errors"])
+        self.style.update(record["style"])
+        self.sentences.update(record["sentences"])
+
+    def to_dict(self):
+        histogram = sorted(self.sentences.items(), key=lambda item: int(item[0].split("-")[0]))
+        return {
+            "root": self.root,
+            "style": self.writing_style,
+            "files": self.files,
+            "failed": self.failed,
+            "words": self.words,
+            "spelling_errors": dict(self.errors.most_common()),
+            "style_hits": dict(self.style.most_common()),
+            "sentence_length_histogram": dict(histogram),
+        }
+
+
+def read_manifest(path, header):
+    # Devuelve los registros ya procesados; una última línea cortada por una
+    # interrupción se descarta. La primera línea identifica corpus y estilo.
+    records = {}
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        return records
+    with open(path, "r", encoding="utf-8") as f:
+        if json.loads(f.readline()) != header:
+            raise ValueError(f"El manifiesto '{path}' corresponde a otro corpus o estilo")
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record["file"]] = record
+    return records
+
+
+def run_corpus(root, spelling_errors, writing_style, manifest_path, workers=1, progress=None):
+    report = CorpusReport(root, writing_style)
+    header = {"corpus": os.path.abspath(root), "style": writing_style}
+    done = read_manifest(manifest_path, header)
+
+    pending = []
+    for relpath in walk_corpus(root):
+        info = os.stat(os.path.join(root, relpath))
+        record = done.get(relpath)
+        # Sólo se reutiliza el resultado si el archivo no cambió desde entonces;
+        # los que fallaron se vuelven a intentar
+        if (record and "error" not in record and record["size"] == info.st_size
+                and record["mtime_ns"] == info.st_mtime_ns):
+            report.add(record)
+        else:
+            pending.append((relpath, info.st_size, info.st_mtime_ns))
+    resumed = report.files
+
+    with open(manifest_path, "a+", encoding="utf-8") as manifest:
+        # Si la corrida anterior se cortó a mitad de línea, empezar una nueva
+        if manifest.tell() and _last_byte(manifest_path) != b"\n":
+            manifest.write("\n")
+
+        def checkpoint(record):
+            manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+            manifest.flush()
+            report.add(record)
+            if progress is not None:
+                progress(report.files - resumed, len(pending), record)
+
+        if workers <= 1 or len(pending) < 2:
+            _init_worker(spelling_errors, writing_style)
+            for job in pending:
+                checkpoint(analyze_corpus_file(root, *job))
+        else:
+            _run_pool(root, pending, spelling_errors, writing_style, workers, checkpoint)
+
+    result = report.to_dict()
+    result["resumed"] = resumed
+    return result
+
+
+def _last_byte(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1)
+
+
+def _run_pool(root, pending, spelling_errors, writing_style, workers, checkpoint):
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    limit = workers * IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(spelling_errors, writing_style)) as pool:
+        in_flight = set()
+        for job in pending:
+            in_flight.add(pool.submit(analyze_corpus_file, root, *job))
+            if len(in_flight) >= limit:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    checkpoint(future.result())
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                checkpoint(future.result())
@@ -0,0 +1,235 @@
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Mapping
+
+# Diccionario de palabras mal escritas comunes incluido con el editor
+DEFAULT_SPELLING_ERRORS = {
+    "aver": "a ver",
+    "haber": "a ver",  # contexto dependiente
+    "ay": "ahí/hay/¡ay!",
+    "ahi": "ahí",
+    "ahy": "ahí",
+    "haver": "a ver",
+    "echo": "hecho",  # contexto dependiente
+    "asta": "hasta",
+    "ace": "hace",
+    "ase": "hace",
+    "asia": "hacia",
+    "porke": "porque",
+    "xq": "porque",
+    "q": "que",
+    "k": "que",
+    "bn": "bien",
+    "tbn": "también",
+    "tmb": "también",
+    "x": "por",
+    "xfa": "por favor",
+    "plis": "por favor",
+    "salu2": "saludos",
+    "grax": "gracias",
+    "gracias": "gracias",
+    "deveria": "debería",
+    "tendria": "tendría",
+    "podria": "podría",
+    "sabria": "sabría",
+    "estaria": "estaría"
+}
+
+# Entradas que son palabras válidas según el contexto: la corrección
+# automática las trata como ambiguas y sólo las cambia si el usuario lo elige
+CONTEXT_DEPENDENT = frozenset({"haber", "echo"})
+
+# Listas regionales que se cargan siempre además de las incluidas
+DICTIONARY_DIR = os.path.join(os.path.expanduser("~"), ".papiweb", "diccionarios")
+INDEX_DIR = os.path.join(os.path.expanduser("~"), ".papiweb", "cache")
+DICTIONARY_EXTENSIONS = (".txt", ".tsv", ".json")
+
+# Formato del índice: cabecera, tabla hash de direccionamiento abierto con
+# (hash, desplazamiento) por casilla y un bloque con las entradas
+INDEX_MAGIC = b"PWDX"
+INDEX_VERSION = 1
+HEADER = struct.Struct("<4sIII")   # magic, versión, casillas, entradas
+SLOT = struct.Struct("<II")        # crc32 de la palabra, desplazamiento + 1
+LENGTH = struct.Struct("<H")
+# Consultas recientes que se guardan ya decodificadas
+MEMO_LIMIT = 50000
+
+
+def read_dictionary_file(path):
+    # Una entrada por línea: "palabra<TAB>corrección" o "palabra=corrección";
+    # las líneas vacías y las que empiezan con # se ignoran. También se
+    # aceptan archivos .json con un objeto {palabra: corrección}.
+    if path.lower().endswith(".json"):
+        import json
+
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f).items()
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            separator = "\t" if "\t" in line else "="
+            word, _, correction = line.partition(separator)
+            if correction.strip():
+                yield word.strip(), correction.strip()
+
+
+def compile_dictionary(entries, index_path):
+    import tempfile
+
+    table = {}
+    for word, correction in entries:
+        table[word.lower()] = correction
+
+    slot_count = 8
+    while slot_count < len(table) * 2:
+        slot_count *= 2
+    mask = slot_count - 1
+    slots = [(0, 0)] * slot_count
+    blob = bytearray()
+    for word, correction in table.items():
+        key = word.encode("utf-8")
+        value = correction.encode("utf-8")
+        offset = len(blob)
+        blob += LENGTH.pack(len(key)) + key + LENGTH.pack(len(value)) + value
+        crc = zlib.crc32(key)
+        i = crc & mask
+        while slots[i][1]:
+            i = (i + 1) & mask
+        slots[i] = (crc, offset + 1)
+
+    directory = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, slot_count, len(table)))
+            f.write(b"".join(SLOT.pack(*slot) for slot in slots))
+            f.write(blob)
+        os.replace(temp_path, index_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+# Diccionario de sólo lectura respaldado por un índice mapeado en memoria:
+# abrirlo no parsea nada y los procesos que lo usan comparten las mismas
+# páginas del sistema operativo. Se comporta como un dict de consulta.
+class SpellingDictionary(Mapping):
+    def __init__(self, index_path):
+        self.path = index_path
+        with open(index_path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, slot_count, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"Índice de diccionario inválido: {index_path}")
+        self.mask = slot_count - 1
+        self.blob_start = HEADER.size + slot_count * SLOT.size
+        self.memo = {}
+
+    def __reduce__(self):
+        # Al pasar a otro proceso se reabre el mismo índice en vez de copiarlo
+        return (SpellingDictionary, (self.path,))
+
+    def _read_entry(self, offset):
+        position = self.blob_start + offset
+        (key_length,) = LENGTH.unpack_from(self.map, position)
+        key = self.map[position + 2:position + 2 + key_length]
+        position += 2 + key_length
+        (value_length,) = LENGTH.unpack_from(self.map, position)
+        value = self.map[position + 2:position + 2 + value_length]
+        return key, value, position + 2 + value_length - self.blob_start
+
+    def lookup(self, word):
+        if word in self.memo:
+            return self.memo[word]
+        key = word.encode("utf-8")
+        crc = zlib.crc32(key)
+        i = crc & self.mask
+        result = None
+        while True:
+            slot_crc, offset = SLOT.unpack_from(self.map, HEADER.size + i * SLOT.size)
+            if not offset:
+                break
+            if slot_crc == crc:
+                entry_key, value, _ = self._read_entry(offset - 1)
+                if entry_key == key:
+                    result = value.decode("utf-8")
+                    break
+            i = (i + 1) & self.mask
+        if len(self.memo) >= MEMO_LIMIT:
+            self.memo.clear()
+        self.memo[word] = result
+        return result
+
+    def __getitem__(self, word):
+        result = self.lookup(word)
+        if result is None:
+            raise KeyError(word)
+        return result
+
+    def __contains__(self, word):
+        return isinstance(word, str) and self.lookup(word) is not None
+
+    def get(self, word, default=None):
+        result = self.lookup(word)
+        return default if result is None else result
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        offset = 0
+        for _ in range(self.count):
+            key, _, offset = self._read_entry(offset)
+            yield key.decode("utf-8")
+
+    def close(self):
+        self.map.close()
+
+
+def dictionary_sources(extra_paths=()):
+    import glob
+
+    sources = []
+    if os.path.isdir(DICTIONARY_DIR):
+        for name in sorted(os.listdir(DICTIONARY_DIR)):
+            if name.lower().endswith(DICTIONARY_EXTENSIONS):
+                sources.append(os.path.join(DICTIONARY_DIR, name))
+    for pattern in extra_paths:
+        sources.extend(sorted(glob.glob(pattern)) or [pattern])
+    return sources
+
+
+def load_spelling_dictionary(extra_paths=()):
+    # Sin listas externas alcanza con el diccionario incluido. Con listas, se
+    # compila un índice que se guarda en caché según la ruta, el tamaño y la
+    # fecha de cada fuente; los siguientes arranques sólo lo mapean.
+    sources = dictionary_sources(extra_paths)
+    if not sources:
+        return dict(DEFAULT_SPELLING_ERRORS)
+
+    import hashlib
+
+    key = hashlib.sha256(repr((INDEX_VERSION, sorted(DEFAULT_SPELLING_ERRORS.items()))).encode())
+    for path in sources:
+        info = os.stat(path)
+        key.update(repr((os.path.abspath(path), info.st_size, info.st_mtime_ns)).encode())
+    index_path = os.path.join(INDEX_DIR, f"diccionario-{key.hexdigest()[:16]}.idx")
+
+    if not os.path.exists(index_path):
+        def entries():
+            # Las fuentes posteriores pisan a las anteriores
+            yield from DEFAULT_SPELLING_ERRORS.items()
+            for path in sources:
+                yield from read_dictionary_file(path)
+        try:
+            compile_dictionary(entries(), index_path)
+        except OSError:
+            # Sin caché escribible: se arma el diccionario en memoria
+            return dict(entries())
+    return SpellingDictionary(index_path)
@@ -1,10 +1,46 @@
+# El perfil de arranque (--startup-profile) se instala antes que el resto de
+# los imports para poder medirlos
+import papiweb_startup
+papiweb_startup.start()
+
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, font
+from tkinter import ttk, filedialog, messagebox, font, simpledialog
 from tkinter.scrolledtext import ScrolledText
-import re
-from datetime import datetime
-import json
 import os
+import queue
+import re
+import sys
+import threading
+import time
+
+from papiweb_analysis import analyze_text, count_spelling_errors, style_message
+from papiweb_autocorrect import apply_corrections, find_ambiguous
+from papiweb_dictionary import load_spelling_dictionary
+from papiweb_io import atomic_write_text, content_hash
+from papiweb_largefile import LARGE_FILE_BYTES, LineIndex, iter_file_lines
+from papiweb_offsets import OffsetIndex, tag_ranges_add, tag_ranges_remove
+from papiweb_pdf import default_pdf_workers, export_text_to_pdf, iter_pdf_pages
+from papiweb_readability import style_advice
+from papiweb_scheduler import AnalysisScheduler
+from papiweb_search import SearchQuery
+from papiweb_styles import WRITING_STYLES
+from papiweb_trace import TRACE_ENV, Tracer
+from papiweb_undo import UndoHistory
+from papiweb_worker import AnalysisWorker
+
+# Líneas del archivo grande que se mantienen cargadas en el editor
+LARGE_FILE_WINDOW = 2000
+# Manejadores que se miden cuando la traza está activa (la importación y la
+# exportación PDF se miden aparte, de principio a fin de la operación)
+TRACED_HANDLERS = ("on_text_change", "update_stats", "auto_check_spelling",
+                   "check_spelling", "analyze_style")
+# Cada cuánto se refresca la latencia en la barra de estado (ms)
+TRACE_REFRESH_MS = 1000
+# Líneas por encima y por debajo de la vista que también se revisan al tipear
+# o desplazarse
+VIEWPORT_MARGIN = 50
+# Cada cuánto se revisa si el análisis en segundo plano terminó (ms)
+ANALYSIS_POLL_MS = 30
 
 class PapiwebEditor:
     def __init__(self, root):
@@ -17,89 +53,57 @@ class PapiwebEditor:
         self.current_file = None
         self.is_modified = False
         self.writing_style = "secundaria"  # por defecto
-        
-        # Diccionarios de palabras mal escritas comunes
-        self.spelling_errors = {
-            "aver": "a ver",
-            "haber": "a ver",  # contexto dependiente
-            "ay": "ahí/hay/¡ay!",
-            "ahi": "ahí",
-            "ahy": "ahí",
-            "haver": "a ver",
-            "echo": "hecho",  # contexto dependiente
-            "asta": "hasta",
-            "ace": "hace",
-            "ase": "hace",
-            "asia": "hacia",
-            "porke": "porque",
-            "xq": "porque",
-            "q": "que",
-            "k": "que",
-            "bn": "bien",
-            "tbn": "también",
-            "tmb": "también",
-            "x": "por",
-            "xfa": "por favor",
-            "plis": "por favor",
-            "salu2": "saludos",
-            "grax": "gracias",
-            "gracias": "gracias",
-            "deveria": "debería",
-            "tendria": "tendría",
-            "podria": "podría",
-            "sabria": "sabría",
-            "estaria": "estaría"
-        }
+        self.scheduler = AnalysisScheduler(root)
+        # Análisis completo del texto, hecho fuera del hilo de Tk. La clave
+        # (revisión, estilo, diccionario) dice a qué versión corresponde.
+        self.analysis_worker = AnalysisWorker()
+        self.analysis_key = None
+        self.analysis = None
+        self.analysis_text = None
+        self.analysis_offsets = None
+        self.analysis_waiting = {}
+        self.dictionary_revision = 0
+        self.pdf_import = None
+        # Búsqueda en curso o última búsqueda terminada (ver start_search)
+        self.search = None
+        self.search_dialog = None
+        # Corrección automática en curso (ver apply_all_corrections)
+        self.correction = None
+        self.pdf_workers = default_pdf_workers()
+        self.suggester = None
+        self.suggester_loading = False
+        self.large_file = None
+        self.large_file_start = 0
+        self.large_file_loaded = 0
+        self.large_file_recenter = None
+        # Revisión del buffer: aumenta con cada inserción o borrado
+        self.edit_revision = 0
+        self.saved_revision = None
+        self.saved_path = None
+        self.saved_hash = None
+        self.save_lock = threading.Lock()
+        # Historial de deshacer propio: deltas compactos con memoria acotada
+        self.history = UndoHistory()
+        
+        # Instrumentación: se envuelven los manejadores antes de conectarlos a
+        # menús y eventos, así todos los caminos pasan por la medición
+        self.tracer = Tracer(enabled=bool(os.environ.get(TRACE_ENV)))
+        self.trace_var = tk.BooleanVar(value=self.tracer.enabled)
+        for name in TRACED_HANDLERS:
+            setattr(self, name, self.tracer.wrap(name, getattr(self, name), self.document_lines))
+        
+        # Diccionario de palabras mal escritas: el incluido más las listas de
+        # ~/.papiweb/diccionarios y las que se carguen desde el menú
+        self.dictionaries = []
+        self.spelling_errors = load_spelling_dictionary()
         
         # Estilos de redacción
-        self.writing_styles = {
-            "secundaria": {
-                "name": "Estudiante Secundario BA",
-                "suggestions": {
-                    "palabras_formales": {
-                        "utilizar": "usar",
-                        "efectuar": "hacer",
-                        "realizar": "hacer",
-                        "obstante": "pero",
-                        "por consiguiente": "entonces",
-                        "por ende": "entonces"
-                    },
-                    "conectores": ["entonces", "después", "también", "pero", "y", "o", "porque"],
-                    "tone": "informal_juvenil"
-                }
-            },
-            "tecnico": {
-                "name": "Desarrollador Técnico",
-                "suggestions": {
-                    "palabras_tecnicas": {
-                        "programa": "aplicación/software",
-                        "hacer": "implementar/desarrollar",
-                        "arreglar": "debuggear/resolver",
-                        "cosa": "componente/módulo",
-                        "problema": "bug/issue"
-                    },
-                    "conectores": ["por lo tanto", "además", "sin embargo", "en consecuencia", "dado que"],
-                    "tone": "tecnico_preciso"
-                }
-            },
-            "universitario": {
-                "name": "Nivel Universitario",
-                "suggestions": {
-                    "palabras_academicas": {
-                        "muy bueno": "excelente",
-                        "malo": "deficiente",
-                        "pensar": "considerar/analizar",
-                        "decir": "expresar/manifestar",
-                        "ver": "observar/analizar"
-                    },
-                    "conectores": ["no obstante", "por consiguiente", "asimismo", "en virtud de", "en este sentido"],
-                    "tone": "academico_formal"
-                }
-            }
-        }
+        self.writing_styles = WRITING_STYLES
         
         self.setup_ui()
         self.setup_bindings()
+        if self.tracer.enabled:
+            self.refresh_trace_status()
         
     def setup_ui(self):
         # Barra de menú
@@ -186,6 +190,13 @@ class PapiwebEditor:
         # Configurar tags para resaltado
         self.text_editor.tag_configure("error", background="#e74c3c", foreground="white")
         self.text_editor.tag_configure("suggestion", background="#f39c12", foreground="white")
+        # Marca (invisible) de líneas ya revisadas; se quita al modificarlas
+        self.text_editor.tag_configure("checked")
+        self.text_editor.tag_configure("search", background="#f1c40f", foreground="#2c3e50")
+        # La selección (coincidencia actual) se ve por encima de los resaltados
+        self.text_editor.tag_raise("sel")
+        self.text_editor.config(yscrollcommand=self.on_yscroll)
+        self.install_text_proxy()
         
         # Barra de estado
         self.create_status_bar()
@@ -203,73 +214,280 @@ class PapiwebEditor:
         file_menu.add_command(label="Guardar como", command=self.save_as_file)
         file_menu.add_separator()
         file_menu.add_command(label="Importar desde PDF", command=self.import_from_pdf)
+        file_menu.add_command(label="Procesos de importación PDF...", command=self.set_pdf_workers)
         file_menu.add_command(label="Exportar a PDF", command=self.export_to_pdf)
         file_menu.add_separator()
         file_menu.add_command(label="Salir", command=self.root.quit)
+        
+        # Menú Editar
+        edit_menu = tk.Menu(menubar, tearoff=0, bg="#34495e", fg="#ecf0f1")
+        menubar.add_cascade(label="Editar", menu=edit_menu)
+        edit_menu.add_command(label="Deshacer", command=self.undo, accelerator="Ctrl+Z")
+        edit_menu.add_command(label="Rehacer", command=self.redo, accelerator="Ctrl+Y")
+        edit_menu.add_command(label="Memoria para deshacer...", command=self.set_undo_budget)
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Cortar", command=lambda: self.text_editor.event_generate("<<Cut>>"))
+        edit_menu.add_command(label="Copiar", command=lambda: self.text_editor.event_generate("<<Copy>>"))
+        edit_menu.add_command(label="Pegar", command=lambda: self.text_editor.event_generate("<<Paste>>"))
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Buscar y reemplazar...", command=self.open_search_dialog,
+                              accelerator="Ctrl+F")
+        edit_menu.add_command(label="Buscar siguiente", command=self.find_next, accelerator="F3")
+        
+        # Menú Herramientas
+        tools_menu = tk.Menu(menubar, tearoff=0, bg="#34495e", fg="#ecf0f1")
+        menubar.add_cascade(label="Herramientas", menu=tools_menu)
+        tools_menu.add_command(label="Verificar Ortografía", command=self.check_spelling)
+        tools_menu.add_command(label="Análisis de Estilo", command=self.analyze_style)
+        tools_menu.add_command(label="Contar Palabras", command=self.update_stats)
+        tools_menu.add_command(label="Aplicar todas las correcciones",
+                               command=self.apply_all_corrections)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Cargar diccionario...", command=self.load_dictionary)
+        tools_menu.add_checkbutton(label="Medir tiempos de respuesta", variable=self.trace_var,
+                                   command=self.toggle_trace)
+
     def import_from_pdf(self):
-        import pdfplumber
         file_path = filedialog.askopenfilename(
             title="Importar desde PDF",
             filetypes=[("Archivos PDF", "*.pdf")]
         )
         if file_path:
+            self.start_pdf_import(file_path)
+            
+    def load_dictionary(self):
+        file_path = filedialog.askopenfilename(
+            title="Cargar diccionario",
+            filetypes=[("Diccionarios", "*.txt *.tsv *.json"), ("Todos los archivos", "*.*")]
+        )
+        if not file_path:
+            return
+        # Compilar una lista grande lleva unos segundos: se hace en un hilo y
+        # el índice queda en caché para los próximos arranques
+        self.status_label.config(text="Cargando diccionario...")
+        results = queue.Queue()
+        paths = self.dictionaries + [file_path]
+        
+        def worker():
             try:
-                with pdfplumber.open(file_path) as pdf:
-                    text = ""
-                    for page in pdf.pages:
-                        text += page.extract_text() or ""
-                self.text_editor.delete("1.0", tk.END)
-                self.text_editor.insert("1.0", text)
-                self.current_file = None
-                self.is_modified = True
-                self.update_title()
-                self.status_label.config(text=f"PDF importado: {os.path.basename(file_path)}")
+                results.put(("done", load_spelling_dictionary(paths)))
             except Exception as e:
-                messagebox.showerror("Error", f"No se pudo importar el PDF:\n{str(e)}")
+                results.put(("error", str(e)))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(50, lambda: self.poll_dictionary(paths, results))
+        
+    def poll_dictionary(self, paths, results):
+        try:
+            kind, value = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, lambda: self.poll_dictionary(paths, results))
+            return
+        if kind == "error":
+            self.status_label.config(text="Error al cargar diccionario")
+            messagebox.showerror("Error", f"No se pudo cargar el diccionario:\n{value}")
+            return
+        self.dictionaries = paths
+        self.spelling_errors = value
+        self.dictionary_revision += 1
+        self.invalidate_highlights()
+        self.status_label.config(text=f"Diccionario cargado: {len(value)} entradas")
+        self.scheduler.schedule("spelling", self.check_spelling, 100, idle=True)
+        
+    def document_lines(self):
+        return int(self.text_editor.index("end-1c").split(".")[0])
+        
+    def toggle_trace(self):
+        self.tracer.set_enabled(self.trace_var.get())
+        if self.tracer.enabled:
+            self.status_label.config(text=f"Traza activa: {self.tracer.path}")
+            self.refresh_trace_status()
+        else:
+            self.trace_label.config(text="")
+            
+    def refresh_trace_status(self):
+        if not self.tracer.enabled:
+            return
+        self.trace_label.config(text=self.tracer.summary())
+        self.root.after(TRACE_REFRESH_MS, self.refresh_trace_status)
+        
+    def set_pdf_workers(self):
+        workers = simpledialog.askinteger(
+            "Importar desde PDF",
+            "Cantidad de procesos para extraer texto\n(1 = extracción en serie):",
+            initialvalue=self.pdf_workers, minvalue=1, maxvalue=default_pdf_workers(),
+            parent=self.root
+        )
+        if workers:
+            self.pdf_workers = workers
+            self.status_label.config(text=f"Importación PDF con {workers} proceso(s)")
+            
+    def start_pdf_import(self, file_path):
+        from papiweb_pdf_cache import default_cache
+        
+        # Cancelar una importación anterior que siga en curso
+        self.cancel_pdf_import()
+        self.close_large_file()
+        
+        # Toda la importación, incluido el borrado del texto anterior, se
+        # deshace de una vez
+        self.history.begin_group()
+        self.text_editor.delete("1.0", tk.END)
+        self.current_file = None
+        self.is_modified = True
+        self.update_title()
+        
+        # Diálogo de progreso: las páginas aparecen en el editor a medida que
+        # se extraen, sin bloquear el bucle principal de Tk
+        dialog = tk.Toplevel(self.root, bg="#34495e")
+        dialog.title("Importando PDF")
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+        tk.Label(dialog, text=os.path.basename(file_path), bg="#34495e", fg="#ecf0f1",
+                font=("Arial", 10, "bold")).pack(padx=20, pady=(15, 5))
+        page_label = tk.Label(dialog, text="Abriendo PDF...", bg="#34495e", fg="#bdc3c7",
+                             font=("Arial", 9))
+        page_label.pack(padx=20)
+        progress = ttk.Progressbar(dialog, length=300, mode="determinate")
+        progress.pack(padx=20, pady=10)
+        tk.Button(dialog, text="Cancelar", bg="#e74c3c", fg="white", font=("Arial", 9, "bold"),
+                 relief=tk.FLAT, command=self.cancel_pdf_import).pack(pady=(0, 15))
+        dialog.protocol("WM_DELETE_WINDOW", self.cancel_pdf_import)
+        
+        cancel_event = threading.Event()
+        results = queue.Queue()
+        self.pdf_import = {
+            "file": file_path,
+            "cancel": cancel_event,
+            "queue": results,
+            "dialog": dialog,
+            "page_label": page_label,
+            "progress": progress,
+            "pages": 0,
+            "started": time.perf_counter(),
+            "cache": default_cache(),
+        }
+        threading.Thread(target=self.pdf_import_worker,
+                         args=(file_path, cancel_event, results, self.pdf_workers,
+                               self.pdf_import["cache"]),
+                         daemon=True).start()
+        self.root.after(50, self.poll_pdf_import)
+        
+    def pdf_import_worker(self, file_path, cancel_event, results, workers, cache):
+        # Corre en un hilo aparte: nunca toca Tk, sólo encola resultados
+        try:
+            for number, total, text in iter_pdf_pages(file_path, cancel_event, workers, cache):
+                results.put(("page", number, total, text))
+            results.put(("done", None, None, None))
+        except Exception as e:
+            results.put(("error", None, None, str(e)))
+            
+    def poll_pdf_import(self):
+        state = self.pdf_import
+        if state is None:
+            return
+        
+        # Insertar lo que haya llegado, con un tope por vuelta para que la
+        # interfaz siga respondiendo aunque el extractor vaya más rápido
+        chunks = []
+        for _ in range(50):
+            try:
+                kind, number, total, text = state["queue"].get_nowait()
+            except queue.Empty:
+                break
+            if kind == "error":
+                self.finish_pdf_import(None)
+                messagebox.showerror("Error", f"No se pudo importar el PDF:\n{text}")
+                return
+            if kind == "done":
+                if chunks:
+                    self.text_editor.insert(tk.END, "".join(chunks))
+                message = f"PDF importado: {os.path.basename(state['file'])}"
+                if state["cache"] is not None:
+                    stats = state["cache"].stats()
+                    message += f" (caché: {stats['hits']} aciertos, {stats['misses']} fallos)"
+                self.finish_pdf_import(message)
+                return
+            chunks.append(text)
+            state["pages"] = number + 1
+            state["progress"].config(maximum=total, value=number + 1)
+            state["page_label"].config(text=f"Página {number + 1} de {total}")
+        
+        if chunks:
+            self.text_editor.insert(tk.END, "".join(chunks))
+        self.root.after(50, self.poll_pdf_import)
+        
+    def cancel_pdf_import(self):
+        if self.pdf_import is not None:
+            self.finish_pdf_import(f"Importación cancelada ({self.pdf_import['pages']} páginas)")
+            
+    def finish_pdf_import(self, message):
+        state = self.pdf_import
+        if state is None:
+            return
+        self.pdf_import = None
+        state["cancel"].set()
+        state["dialog"].destroy()
+        self.history.end_group()
+        self.tracer.record("import_from_pdf", time.perf_counter() - state["started"],
+                           self.document_lines(), pages=state["pages"])
+        if message:
+            self.status_label.config(text=message)
+        self.scheduler.schedule("stats", self.update_stats, 300, idle=True)
+        self.scheduler.schedule("spelling", self.auto_check_spelling, 500)
 
     def export_to_pdf(self):
-        from reportlab.lib.pagesizes import letter
-        from reportlab.pdfgen import canvas
         file_path = filedialog.asksaveasfilename(
             title="Exportar a PDF",
             defaultextension=".pdf",
             filetypes=[("Archivos PDF", "*.pdf")]
         )
         if file_path:
-            try:
+            # El armado del PDF corre en otro hilo sobre una copia del texto;
+            # el hilo no es daemon para que cerrar la ventana no corte el archivo.
+            # Del archivo grande el editor sólo tiene una ventana de líneas: se
+            # exporta leyendo el archivo completo línea por línea.
+            if self.large_file is not None:
+                content = iter_file_lines(self.large_file.path, self.large_file.encoding)
+            else:
                 content = self.text_editor.get("1.0", tk.END).strip()
-                c = canvas.Canvas(file_path, pagesize=letter)
-                width, height = letter
-                margin = 40
-                y = height - margin
-                for line in content.split('\n'):
-                    c.drawString(margin, y, line)
-                    y -= 15
-                    if y < margin:
-                        c.showPage()
-                        y = height - margin
-                c.save()
-                self.status_label.config(text=f"PDF exportado: {os.path.basename(file_path)}")
+            results = queue.Queue()
+            threading.Thread(target=self.pdf_export_worker,
+                             args=(content, file_path, results)).start()
+            self.status_label.config(text="Exportando PDF...")
+            started = time.perf_counter()
+            self.root.after(100, lambda: self.poll_pdf_export(file_path, results, started))
+            
+    def pdf_export_worker(self, content, file_path, results):
+        try:
+            pages = export_text_to_pdf(content, file_path,
+                                       progress=lambda page: results.put(("page", page)))
+            results.put(("done", pages))
+        except Exception as e:
+            results.put(("error", str(e)))
+            
+    def poll_pdf_export(self, file_path, results, started):
+        page = None
+        while True:
+            try:
+                kind, value = results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "error":
+                messagebox.showerror("Error", f"No se pudo exportar a PDF:\n{value}")
+                self.status_label.config(text="Error al exportar PDF")
+                return
+            if kind == "done":
+                self.tracer.record("export_to_pdf", time.perf_counter() - started,
+                                   self.document_lines(), pages=value)
+                self.status_label.config(
+                    text=f"PDF exportado: {os.path.basename(file_path)} ({value} páginas)")
                 messagebox.showinfo("Exportar a PDF", "El archivo PDF se ha guardado correctamente.")
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo exportar a PDF:\n{str(e)}")
-        
-        # Menú Editar
-        edit_menu = tk.Menu(menubar, tearoff=0, bg="#34495e", fg="#ecf0f1")
-        menubar.add_cascade(label="Editar", menu=edit_menu)
-        edit_menu.add_command(label="Deshacer", command=lambda: self.text_editor.edit_undo(), accelerator="Ctrl+Z")
-        edit_menu.add_command(label="Rehacer", command=lambda: self.text_editor.edit_redo(), accelerator="Ctrl+Y")
-        edit_menu.add_separator()
-        edit_menu.add_command(label="Cortar", command=lambda: self.text_editor.event_generate("<<Cut>>"))
-        edit_menu.add_command(label="Copiar", command=lambda: self.text_editor.event_generate("<<Copy>>"))
-        edit_menu.add_command(label="Pegar", command=lambda: self.text_editor.event_generate("<<Paste>>"))
-        
-        # Menú Herramientas
-        tools_menu = tk.Menu(menubar, tearoff=0, bg="#34495e", fg="#ecf0f1")
-        menubar.add_cascade(label="Herramientas", menu=tools_menu)
-        tools_menu.add_command(label="Verificar Ortografía", command=self.check_spelling)
-        tools_menu.add_command(label="Análisis de Estilo", command=self.analyze_style)
-        tools_menu.add_command(label="Contar Palabras", command=self.update_stats)
+                return
+            page = value
+        if page is not None:
+            self.status_label.config(text=f"Exportando PDF... página {page}")
+        self.root.after(100, lambda: self.poll_pdf_export(file_path, results, started))
         
     def create_toolbar(self):
         toolbar = tk.Frame(self.root, bg="#34495e", height=35)
@@ -333,6 +551,11 @@ class PapiwebEditor:
                                     bg="#34495e", fg="#ecf0f1", font=("Arial", 9))
         self.status_label.pack(side=tk.LEFT, padx=10)
         
+        # Latencias de la traza (sólo visible con la traza activa)
+        self.trace_label = tk.Label(self.status_bar, text="", bg="#34495e", fg="#f1c40f",
+                                   font=("Arial", 9))
+        self.trace_label.pack(side=tk.RIGHT, padx=10)
+        
         # Información de posición del cursor
         self.cursor_label = tk.Label(self.status_bar, text="Línea: 1, Columna: 1", 
                                     bg="#34495e", fg="#ecf0f1", font=("Arial", 9))
@@ -344,18 +567,324 @@ class PapiwebEditor:
         self.root.bind("<Control-o>", lambda e: self.open_file())
         self.root.bind("<Control-s>", lambda e: self.save_file())
         self.root.bind("<F7>", lambda e: self.check_spelling())
+        self.root.bind("<Control-f>", lambda e: self.open_search_dialog())
+        self.root.bind("<F3>", lambda e: self.find_next())
         
         # Eventos del editor
         self.text_editor.bind("<KeyRelease>", self.on_text_change)
         self.text_editor.bind("<ButtonRelease-1>", self.update_cursor_position)
         self.text_editor.bind("<KeyRelease>", self.update_cursor_position, add="+")
+        # Reemplazan al deshacer de Tk, que está desactivado
+        for sequence in ("<Control-z>", "<<Undo>>"):
+            self.text_editor.bind(sequence, self.undo)
+        for sequence in ("<Control-y>", "<<Redo>>"):
+            self.text_editor.bind(sequence, self.redo)
+        
+    def install_text_proxy(self):
+        # Redirige el comando Tcl del widget para enterarnos de cada inserción
+        # o borrado, venga del teclado, del portapapeles o del propio código
+        widget = str(self.text_editor)
+        self.text_widget_cmd = widget + "_orig"
+        self.root.tk.call("rename", widget, self.text_widget_cmd)
+        self.root.tk.createcommand(widget, self.text_proxy)
+        
+    def text_proxy(self, *args):
+        call = self.root.tk.call
+        orig = self.text_widget_cmd
+        if not args or args[0] not in ("insert", "delete", "replace"):
+            return call((orig,) + args)
+        
+        # Las marcas siguen al texto: "dirty_start" queda antes de lo insertado
+        # y "dirty_end" después, así cubren exactamente la región tocada
+        index = str(call(orig, "index", args[1]))
+        if self.root.tk.getboolean(call(orig, "compare", index, "==", "end")):
+            index = str(call(orig, "index", "end-1c"))
+        call(orig, "mark", "set", "dirty_start", index)
+        call(orig, "mark", "gravity", "dirty_start", "left")
+        call(orig, "mark", "set", "dirty_end", index)
+        
+        # El texto que se va a borrar se guarda antes de que desaparezca. La
+        # ventana del modo archivo grande no es una edición: no se registra.
+        record = self.history.recording and self.large_file is None
+        deleted = ""
+        deleted_end = None
+        if record and args[0] != "insert":
+            if args[0] == "delete" and len(args) > 3:
+                # Borrado de varios rangos a la vez: no se puede deshacer
+                record = False
+                self.history.clear()
+            else:
+                last = args[2] if len(args) > 2 else f"{args[1]}+1c"
+                # Tk nunca borra el salto de línea final
+                if self.root.tk.getboolean(call(orig, "compare", last, ">", "end-1c")):
+                    last = "end-1c"
+                deleted_end = str(call(orig, "index", last))
+                deleted = str(call(orig, "get", index, deleted_end))
+        
+        result = call((orig,) + args)
+        call(orig, "tag", "remove", "checked", "dirty_start linestart", "dirty_end lineend+1c")
+        self.edit_revision += 1
+        if record:
+            self.record_edit(args, deleted, deleted_end)
+        return result
+        
+    def record_edit(self, args, deleted, deleted_end):
+        call = self.root.tk.call
+        orig = self.text_widget_cmd
+        start = str(call(orig, "index", "dirty_start"))
+        if args[0] == "insert":
+            self.history.record("insert", start, str(call(orig, "index", "dirty_end")),
+                                "".join(args[2::2]))
+        elif args[0] == "delete":
+            self.history.record("delete", start, deleted_end, deleted)
+        else:
+            # replace es un borrado más una inserción: se deshacen juntos
+            self.history.begin_group()
+            self.history.record("delete", start, deleted_end, deleted)
+            self.history.record("insert", start, str(call(orig, "index", "dirty_end")),
+                                "".join(args[3::2]))
+            self.history.end_group()
+        
+    def undo(self, event=None):
+        entry = None if self.large_file is not None else self.history.pop_undo()
+        if entry is None:
+            self.status_label.config(text="Nada para deshacer")
+            return "break"
+        # Se aplica la inversa de cada delta, del último al primero
+        self.history.pause()
+        try:
+            for delta in reversed(entry):
+                if delta.kind == "insert":
+                    self.text_editor.delete(delta.index, f"{delta.index}+{delta.length}c")
+                else:
+                    self.text_editor.insert(delta.index, delta.text)
+        finally:
+            self.history.resume()
+        self.after_history_change(entry[0].index)
+        return "break"
+        
+    def redo(self, event=None):
+        entry = None if self.large_file is not None else self.history.pop_redo()
+        if entry is None:
+            self.status_label.config(text="Nada para rehacer")
+            return "break"
+        self.history.pause()
+        try:
+            for delta in entry:
+                if delta.kind == "insert":
+                    self.text_editor.insert(delta.index, delta.text)
+                else:
+                    self.text_editor.delete(delta.index, f"{delta.index}+{delta.length}c")
+        finally:
+            self.history.resume()
+        self.after_history_change(entry[-1].index)
+        return "break"
+        
+    def after_history_change(self, index):
+        self.text_editor.mark_set("insert", index)
+        self.text_editor.see("insert")
+        self.on_text_change()
+        self.update_cursor_position()
+        
+    def set_undo_budget(self):
+        megabytes = simpledialog.askinteger(
+            "Deshacer",
+            "Memoria máxima para el historial de deshacer (MB):",
+            initialvalue=self.history.budget // (1024 * 1024), minvalue=1, maxvalue=4096,
+            parent=self.root
+        )
+        if megabytes:
+            self.history.set_budget(megabytes * 1024 * 1024)
+            self.status_label.config(
+                text=f"Historial de deshacer: {self.history.bytes / (1024 * 1024):.1f} de {megabytes} MB")
+        
+    def open_search_dialog(self):
+        if self.search_dialog is not None:
+            self.search_dialog.lift()
+            self.search_entry.focus_set()
+            return
+        dialog = tk.Toplevel(self.root, bg="#34495e")
+        dialog.title("Buscar y reemplazar")
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+        self.search_dialog = dialog
+        self.search_var = tk.StringVar()
+        self.replace_var = tk.StringVar()
+        self.search_regex_var = tk.BooleanVar(value=False)
+        self.search_case_var = tk.BooleanVar(value=False)
+        
+        for row, (label, variable) in enumerate((("Buscar:", self.search_var),
+                                                 ("Reemplazar por:", self.replace_var))):
+            tk.Label(dialog, text=label, bg="#34495e", fg="#ecf0f1",
+                    font=("Arial", 9)).grid(row=row, column=0, sticky=tk.W, padx=(15, 5), pady=5)
+            entry = tk.Entry(dialog, textvariable=variable, width=40, font=("Arial", 10))
+            entry.grid(row=row, column=1, columnspan=3, padx=(0, 15), pady=5)
+            if row == 0:
+                self.search_entry = entry
+        tk.Checkbutton(dialog, text="Expresión regular", variable=self.search_regex_var,
+                      bg="#34495e", fg="#ecf0f1", selectcolor="#2c3e50",
+                      activebackground="#34495e").grid(row=2, column=1, sticky=tk.W)
+        tk.Checkbutton(dialog, text="Distinguir mayúsculas", variable=self.search_case_var,
+                      bg="#34495e", fg="#ecf0f1", selectcolor="#2c3e50",
+                      activebackground="#34495e").grid(row=2, column=2, columnspan=2, sticky=tk.W)
+        for column, (text, command) in enumerate((("Buscar todo", self.find_all),
+                                                  ("Siguiente", self.find_next),
+                                                  ("Reemplazar todo", self.replace_all))):
+            tk.Button(dialog, text=text, bg="#3498db", fg="white", font=("Arial", 9, "bold"),
+                     relief=tk.FLAT, command=command).grid(row=3, column=column + 1, padx=5,
+                                                           pady=(5, 15), sticky=tk.EW)
+        
+        self.search_entry.bind("<Return>", lambda e: self.find_next())
+        dialog.bind("<Escape>", lambda e: self.close_search_dialog())
+        dialog.protocol("WM_DELETE_WINDOW", self.close_search_dialog)
+        self.search_entry.focus_set()
+        
+    def close_search_dialog(self):
+        if self.search_dialog is not None:
+            self.search_dialog.destroy()
+            self.search_dialog = None
+        self.text_editor.tag_remove("search", "1.0", tk.END)
+        self.search = None
+        
+    def search_query(self):
+        # La consulta del diálogo, o None (con el error ya informado)
+        if self.search_dialog is None or not self.search_var.get():
+            return None
+        try:
+            return SearchQuery(self.search_var.get(), self.search_regex_var.get(),
+                               not self.search_case_var.get())
+        except re.error as e:
+            messagebox.showerror("Buscar", f"Expresión regular inválida:\n{e}",
+                                 parent=self.search_dialog)
+            return None
+        
+    def find_all(self):
+        query = self.search_query()
+        if query is not None:
+            self.start_search(query)
+        
+    def find_next(self):
+        search = self.search
+        if search is not None and "hits" not in search:
+            # Búsqueda en curso: al terminar salta a la primera coincidencia
+            search["jump"] = True
+            return
+        if (search is None or search["revision"] != self.edit_revision
+                or not self.search_is_current(search["query"])):
+            query = self.search_query()
+            if query is None:
+                self.open_search_dialog()
+                return
+            self.start_search(query, jump=True)
+            return
+        hits = search["hits"]
+        if not hits:
+            self.status_label.config(text=f"Sin coincidencias{self.large_file_scope()}")
+            return
+        search["current"] = (search["current"] + 1) % len(hits)
+        start, end = search["offsets"].ranges([hits[search["current"]]])
+        self.text_editor.tag_remove("sel", "1.0", tk.END)
+        self.text_editor.tag_add("sel", start, end)
+        self.text_editor.mark_set("insert", end)
+        self.text_editor.see(start)
+        self.update_cursor_position()
+        self.status_label.config(text=f"Coincidencia {search['current'] + 1} de {len(hits)}")
+        
+    def search_is_current(self, query):
+        # Si el diálogo sigue pidiendo lo mismo que la búsqueda hecha
+        if self.search_dialog is None:
+            return True
+        return (query.query, query.regex, query.ignore_case) == (
+            self.search_var.get(), self.search_regex_var.get(), not self.search_case_var.get())
+        
+    def replace_all(self):
+        query = self.search_query()
+        if query is None:
+            return
+        if self.large_file is not None:
+            self.status_label.config(text="El archivo grande se abre en modo de solo lectura")
+            return
+        self.start_search(query, replacement=self.replace_var.get())
+        
+    def start_search(self, query, replacement=None, jump=False):
+        # La búsqueda (o el reemplazo) corre en un hilo sobre una copia del
+        # texto; el resultado se aplica sólo si el texto no cambió entretanto
+        content = self.text_editor.get("1.0", tk.END + "-1c")
+        results = queue.Queue()
+        self.search = {"query": query, "revision": self.edit_revision, "jump": jump}
+        
+        def worker():
+            try:
+                if replacement is None:
+                    value = query.find_all(content)
+                else:
+                    value = query.replace_all(content, replacement)
+                results.put(("done", value, OffsetIndex(content), len(content)))
+            except Exception as e:
+                results.put(("error", str(e), None, None))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.status_label.config(text="Buscando...")
+        self.root.after(50, lambda: self.poll_search(self.search, replacement, results))
+        
+    def poll_search(self, search, replacement, results):
+        try:
+            kind, value, offsets, length = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, lambda: self.poll_search(search, replacement, results))
+            return
+        if search is not self.search:
+            return
+        if kind == "error":
+            self.search = None
+            self.status_label.config(text=f"Error en la búsqueda: {value}")
+            return
+        if search["revision"] != self.edit_revision:
+            # El texto cambió mientras se buscaba: se repite sobre el actual
+            self.start_search(search["query"], replacement, search["jump"])
+            return
+        
+        if replacement is not None:
+            self.apply_replacement(value, offsets, length)
+            return
+        search.update(hits=value, offsets=offsets, current=-1)
+        self.text_editor.tag_remove("search", "1.0", tk.END)
+        tag_ranges_add(self.text_editor, "search", offsets.ranges(value))
+        self.status_label.config(text=f"{len(value)} coincidencia(s){self.large_file_scope()}")
+        if search["jump"]:
+            self.find_next()
+        
+    def apply_replacement(self, result, offsets, old_length):
+        self.search = None
+        self.text_editor.tag_remove("search", "1.0", tk.END)
+        count = self.replace_changed_span(result, offsets, old_length)
+        if not count:
+            self.status_label.config(text="Sin coincidencias para reemplazar")
+            return
+        self.status_label.config(text=f"{count} reemplazo(s)")
+        
+    def replace_changed_span(self, result, offsets, old_length):
+        # result: (texto nuevo, cambios, inicio del primero, fin del último).
+        # Un solo "replace" de Tk sobre el tramo entre el primer y el último
+        # cambio: una edición (y una entrada de deshacer) en lugar de un
+        # borrado y una inserción por coincidencia
+        new_text, count, first, last = result
+        if count:
+            middle = new_text[first:len(new_text) - (old_length - last)]
+            self.text_editor.replace(offsets.index(first), offsets.index(last), middle)
+            self.on_text_change()
+        return count
         
     def on_text_change(self, event=None):
+        # En modo archivo grande el editor es de solo lectura
+        if self.large_file is not None:
+            return
         self.is_modified = True
         self.update_title()
-        self.update_stats()
+        # Los análisis se agrupan: una ráfaga de teclas dispara una sola pasada
+        self.scheduler.schedule("stats", self.update_stats, 300, idle=True)
         # Auto-corrección en tiempo real
-        self.root.after(500, self.auto_check_spelling)
+        self.scheduler.schedule("spelling", self.auto_check_spelling, 500)
         
     def update_title(self):
         title = "Papiweb Editor Pro"
@@ -370,33 +899,82 @@ class PapiwebEditor:
         line, col = cursor_pos.split('.')
         self.cursor_label.config(text=f"Línea: {line}, Columna: {int(col)+1}")
         
-    def update_stats(self):
-        content = self.text_editor.get("1.0", tk.END)
-        
-        # Contar palabras
-        words = len(content.split())
-        
-        # Contar caracteres
-        chars = len(content) - 1  # -1 para excluir el último \n
+    def current_analysis_key(self):
+        return (self.edit_revision, self.writing_style, self.dictionary_revision)
+        
+    def get_analysis(self, retry=None):
+        # Una sola pasada sobre el texto alimenta estadísticas, ortografía y
+        # estilo; si el texto no cambió se reutiliza el último resultado. Si
+        # no hay uno al día se pide al trabajador y se devuelve None: retry se
+        # vuelve a llamar cuando llegue.
+        if self.analysis_key == self.current_analysis_key():
+            return self.analysis
+        if retry is not None:
+            self.analysis_waiting[retry.__name__] = retry
+        self.request_analysis()
+        return None
+        
+    def request_analysis(self):
+        # Con un trabajo en curso no se pide otro: al llegar su resultado se
+        # ve si sigue sirviendo
+        if self.analysis_worker.busy:
+            return
+        content = self.text_editor.get("1.0", tk.END + "-1c")
+        try:
+            self.analysis_worker.submit(self.current_analysis_key(), content,
+                                        self.spelling_errors, self.writing_style)
+        except Exception as e:
+            self.analysis_waiting.clear()
+            self.status_label.config(text=f"Error en el análisis: {e}")
+            return
+        self.root.after(ANALYSIS_POLL_MS, self.poll_analysis)
         
-        # Contar párrafos
-        paragraphs = len([p for p in content.split('\n') if p.strip()])
+    def poll_analysis(self):
+        try:
+            done = self.analysis_worker.poll()
+        except Exception as e:
+            self.analysis_waiting.clear()
+            self.status_label.config(text=f"Error en el análisis: {e}")
+            return
+        if done is None:
+            self.root.after(ANALYSIS_POLL_MS, self.poll_analysis)
+            return
+        key, content, analysis = done
+        if key != self.current_analysis_key():
+            # El texto cambió mientras se analizaba: el resultado ya no vale
+            self.analysis_worker.stale += 1
+            if self.analysis_waiting:
+                self.request_analysis()
+            return
+        self.analysis_key = key
+        self.analysis = analysis
+        self.analysis_text = content
+        self.analysis_offsets = None
+        waiting, self.analysis_waiting = self.analysis_waiting, {}
+        for callback in waiting.values():
+            callback()
+        
+    def get_analysis_offsets(self):
+        # Índice de líneas del texto del último análisis, para pasar sus
+        # posiciones a índices Tk sin que Tk recorra el buffer cada vez
+        if self.analysis_offsets is None:
+            self.analysis_offsets = OffsetIndex(self.analysis_text)
+        return self.analysis_offsets
         
-        # Contar errores ortográficos
-        errors = self.count_spelling_errors(content)
+    def update_stats(self):
+        analysis = self.get_analysis(self.update_stats)
+        if analysis is None:
+            return
         
-        self.stats_labels["Palabras:"].config(text=str(words))
-        self.stats_labels["Caracteres:"].config(text=str(chars))
-        self.stats_labels["Párrafos:"].config(text=str(paragraphs))
-        self.stats_labels["Errores:"].config(text=str(errors))
+        self.stats_labels["Palabras:"].config(text=str(analysis["words"]))
+        self.stats_labels["Caracteres:"].config(text=str(analysis["characters"]))
+        self.stats_labels["Párrafos:"].config(text=str(analysis["paragraphs"]))
+        self.stats_labels["Errores:"].config(text=str(len(analysis["spelling_hits"])))
+        if self.large_file is not None:
+            self.status_label.config(text=f"Estadísticas{self.large_file_scope()}")
         
     def count_spelling_errors(self, text):
-        words = re.findall(r'\b\w+\b', text.lower())
-        error_count = 0
-        for word in words:
-            if word in self.spelling_errors:
-                error_count += 1
-        return error_count
+        return count_spelling_errors(text, self.spelling_errors)
         
     def new_file(self):
         if self.is_modified:
@@ -404,7 +982,11 @@ class PapiwebEditor:
                 return
             self.save_file()
         
+        self.close_large_file()
+        self.history.pause()
         self.text_editor.delete("1.0", tk.END)
+        self.history.resume()
+        self.history.clear()
         self.current_file = None
         self.is_modified = False
         self.update_title()
@@ -421,37 +1003,215 @@ class PapiwebEditor:
         )
         
         if file_path:
+            self.close_large_file()
             try:
+                if os.path.getsize(file_path) >= LARGE_FILE_BYTES:
+                    return self.open_large_file(file_path)
+                
                 with open(file_path, 'r', encoding='utf-8') as file:
                     content = file.read()
-                    self.text_editor.delete("1.0", tk.END)
-                    self.text_editor.insert("1.0", content)
+                    self.history.pause()
+                    try:
+                        self.text_editor.delete("1.0", tk.END)
+                        self.text_editor.insert("1.0", content)
+                    finally:
+                        self.history.resume()
+                    self.history.clear()
                 
                 self.current_file = file_path
                 self.is_modified = False
+                self.mark_saved(file_path, self.edit_revision, None)
                 self.update_title()
                 self.status_label.config(text=f"Archivo abierto: {os.path.basename(file_path)}")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo abrir el archivo:\n{str(e)}")
                 
+    def open_large_file(self, file_path):
+        # Modo archivo grande: el archivo queda mapeado en memoria y el editor
+        # sólo contiene una ventana de líneas alrededor de la zona visible
+        self.large_file = LineIndex(file_path)
+        self.large_file.start()
+        self.history.clear()
+        self.current_file = file_path
+        self.is_modified = False
+        self.text_editor.config(yscrollcommand=self.large_file_yscroll)
+        self.text_editor.vbar.config(command=self.large_file_scroll)
+        self.load_large_file_window(0)
+        self.update_title()
+        self.status_label.config(text=f"Archivo grande (solo lectura): {os.path.basename(file_path)}")
+        self.root.after(200, self.poll_large_file_index)
+        
+    def close_large_file(self):
+        if self.large_file is None:
+            return
+        if self.large_file_recenter is not None:
+            self.root.after_cancel(self.large_file_recenter)
+            self.large_file_recenter = None
+        self.large_file.close()
+        self.large_file = None
+        self.text_editor.config(state=tk.NORMAL, yscrollcommand=self.on_yscroll)
+        self.text_editor.vbar.config(command=self.text_editor.yview)
+        
+    def load_large_file_window(self, first_line):
+        total = self.large_file.line_count()
+        first = max(0, min(first_line, total - LARGE_FILE_WINDOW))
+        content = self.large_file.get_lines(first, LARGE_FILE_WINDOW)
+        self.text_editor.config(state=tk.NORMAL)
+        self.text_editor.delete("1.0", tk.END)
+        self.text_editor.insert("1.0", content)
+        self.text_editor.config(state=tk.DISABLED)
+        self.large_file_start = first
+        self.large_file_loaded = min(LARGE_FILE_WINDOW, total - first)
+        
+    def poll_large_file_index(self):
+        index = self.large_file
+        if index is None:
+            return
+        # La ventana inicial puede haberse cargado con el índice a medias
+        if self.large_file_loaded < LARGE_FILE_WINDOW and index.line_count() > self.large_file_loaded:
+            top = self.large_file_view_line()
+            self.load_large_file_window(self.large_file_start)
+            self.text_editor.yview(f"{top - self.large_file_start + 1}.0")
+        self.large_file_yscroll()
+        
+        name = os.path.basename(self.current_file)
+        if index.complete:
+            self.status_label.config(
+                text=f"Archivo grande (solo lectura): {name} - {index.line_count()} líneas")
+        else:
+            self.status_label.config(
+                text=f"Indexando {name}... {int(index.progress() * 100)}%")
+            self.root.after(200, self.poll_large_file_index)
+            
+    def large_file_scope(self):
+        # En modo archivo grande el análisis, la revisión y la búsqueda ven sólo
+        # la ventana cargada en el editor: se aclara junto a los resultados
+        if self.large_file is None:
+            return ""
+        first = self.large_file_start + 1
+        last = self.large_file_start + self.large_file_loaded
+        return (f" (sólo líneas {first}-{last} de {self.large_file.line_count()}"
+                f"{'' if self.large_file.complete else '+'} cargadas)")
+        
+    def large_file_view_line(self):
+        # Primera línea visible, contada desde el inicio del archivo
+        return self.large_file_start + int(self.text_editor.index("@0,0").split('.')[0]) - 1
+        
+    def large_file_yscroll(self, first=None, last=None):
+        if self.large_file is None:
+            return
+        total = max(self.large_file.line_count(), 1)
+        top = self.large_file_view_line()
+        bottom = self.large_file_start + int(
+            self.text_editor.index(f"@0,{self.text_editor.winfo_height()}").split('.')[0])
+        self.text_editor.vbar.set(top / total, min(bottom / total, 1.0))
+        self.scheduler.schedule("spelling", self.auto_check_spelling, 100, idle=True)
+        
+        # Cerca de un borde de la ventana se carga una nueva centrada en la vista
+        margin = LARGE_FILE_WINDOW // 4
+        near_top = self.large_file_start > 0 and top - self.large_file_start < margin
+        near_bottom = (self.large_file_start + self.large_file_loaded < total
+                       and self.large_file_start + self.large_file_loaded - bottom < margin)
+        if (near_top or near_bottom) and self.large_file_recenter is None:
+            self.large_file_recenter = self.root.after_idle(self.recenter_large_file)
+            
+    def recenter_large_file(self):
+        self.large_file_recenter = None
+        if self.large_file is not None:
+            self.show_large_file_line(self.large_file_view_line(), force=True)
+        
+    def show_large_file_line(self, line, force=False):
+        end = self.large_file_start + self.large_file_loaded
+        if force or not (self.large_file_start <= line < end - LARGE_FILE_WINDOW // 4):
+            self.load_large_file_window(line - LARGE_FILE_WINDOW // 2)
+        self.text_editor.yview(f"{line - self.large_file_start + 1}.0")
+        
+    def large_file_scroll(self, *args):
+        if args[0] == "moveto":
+            total = self.large_file.line_count()
+            line = int(float(args[1]) * total)
+            self.show_large_file_line(max(0, min(line, total - 1)))
+        else:
+            self.text_editor.yview(*args)
+            
     def save_file(self):
+        if self.large_file is not None:
+            self.status_label.config(text="Los archivos grandes se abren en modo de solo lectura")
+            return False
+        
         if not self.current_file:
             return self.save_as_file()
         
-        try:
-            content = self.text_editor.get("1.0", tk.END + "-1c")
-            with open(self.current_file, 'w', encoding='utf-8') as file:
-                file.write(content)
-            
+        # Sin inserciones ni borrados desde el último guardado: nada que escribir
+        if self.current_file == self.saved_path and self.edit_revision == self.saved_revision:
             self.is_modified = False
             self.update_title()
-            self.status_label.config(text=f"Archivo guardado: {os.path.basename(self.current_file)}")
+            self.status_label.config(text=f"Sin cambios: {os.path.basename(self.current_file)}")
             return True
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo guardar el archivo:\n{str(e)}")
-            return False
+        
+        # Se copia el buffer y la escritura sigue en otro hilo; no es daemon
+        # para que cerrar la ventana no interrumpa un guardado en curso
+        content = self.text_editor.get("1.0", tk.END + "-1c")
+        results = queue.Queue()
+        threading.Thread(target=self.save_worker,
+                         args=(self.current_file, content, self.edit_revision, results)).start()
+        self.status_label.config(text=f"Guardando {os.path.basename(self.current_file)}...")
+        path = self.current_file
+        self.root.after(50, lambda: self.poll_save(path, results))
+        return True
+        
+    def save_worker(self, path, content, revision, results):
+        # Los guardados se hacen de a uno para no pisarse entre sí
+        with self.save_lock:
+            try:
+                start = time.perf_counter()
+                digest = content_hash(content)
+                if path == self.saved_path and digest == self.saved_hash:
+                    results.put(("unchanged", revision, digest))
+                    return
+                written = atomic_write_text(
+                    path, content,
+                    progress=lambda done, total: results.put(("progress", done, total)))
+                results.put(("done", revision, digest, written, time.perf_counter() - start))
+            except Exception as e:
+                results.put(("error", str(e)))
+                
+    def poll_save(self, path, results):
+        name = os.path.basename(path)
+        while True:
+            try:
+                kind, *values = results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                done, total = values
+                self.status_label.config(text=f"Guardando {name}... {done * 100 // max(total, 1)}%")
+            elif kind == "error":
+                self.status_label.config(text=f"Error al guardar {name}")
+                messagebox.showerror("Error", f"No se pudo guardar el archivo:\n{values[0]}")
+                return
+            elif kind == "unchanged":
+                revision, digest = values
+                self.mark_saved(path, revision, digest)
+                self.status_label.config(text=f"Sin cambios: {name}")
+                return
+            else:
+                revision, digest, written, elapsed = values
+                self.mark_saved(path, revision, digest)
+                self.status_label.config(
+                    text=f"Archivo guardado: {name} ({written / 1024:.0f} KB en {elapsed * 1000:.0f} ms)")
+                return
+        self.root.after(50, lambda: self.poll_save(path, results))
+        
+    def mark_saved(self, path, revision, digest):
+        self.saved_path = path
+        self.saved_revision = revision
+        self.saved_hash = digest
+        # Si se siguió escribiendo mientras se guardaba, el documento sigue modificado
+        if path == self.current_file and revision == self.edit_revision:
+            self.is_modified = False
+            self.update_title()
             
     def save_as_file(self):
         file_path = filedialog.asksaveasfilename(
@@ -496,19 +1256,16 @@ class PapiwebEditor:
         self.text_editor.config(font=current_font)
         
     def check_spelling(self):
+        analysis = self.get_analysis(self.check_spelling)
+        if analysis is None:
+            self.status_label.config(text="Revisando ortografía...")
+            return
         self.text_editor.tag_remove("error", "1.0", tk.END)
-        content = self.text_editor.get("1.0", tk.END)
-        
-        suggestions = []
-        words = re.finditer(r'\b\w+\b', content)
         
-        for match in words:
-            word = match.group().lower()
-            if word in self.spelling_errors:
-                start_pos = f"1.0+{match.start()}c"
-                end_pos = f"1.0+{match.end()}c"
-                self.text_editor.tag_add("error", start_pos, end_pos)
-                suggestions.append(f"'{word}' → {self.spelling_errors[word]}")
+        hits = analysis["spelling_hits"]
+        offsets = self.get_analysis_offsets()
+        tag_ranges_add(self.text_editor, "error", offsets.ranges(hits))
+        suggestions = [f"'{word.lower()}' → {suggestion}" for _, _, word, suggestion in hits]
         
         if suggestions:
             suggestion_text = "Errores encontrados:\n\n" + "\n".join(suggestions[:10])
@@ -517,54 +1274,240 @@ class PapiwebEditor:
         else:
             suggestion_text = "✓ No se encontraron errores ortográficos"
         
+        # Palabras fuera de la lista del español, con las correcciones más
+        # cercanas. Sólo en la revisión manual: no corre al tipear.
+        unknown = []
+        if self.suggester is None:
+            self.load_suggester()
+            suggestion_text += "\n\nPreparando sugerencias para palabras desconocidas..."
+        else:
+            from papiweb_suggest import find_unknown_words
+            unknown = find_unknown_words(self.analysis_text, self.suggester, self.spelling_errors)
+            tag_ranges_add(self.text_editor, "error", offsets.ranges(unknown))
+            listed = []
+            for start, end, word in unknown:
+                if len(listed) < 10 and word.lower() not in listed:
+                    listed.append(word.lower())
+            if listed:
+                lines = []
+                for word in listed:
+                    options = ", ".join(option for option, _ in self.suggester.lookup(word, 3))
+                    lines.append(f"'{word}' → {options or 'sin sugerencias'}")
+                suggestion_text += "\n\nPalabras desconocidas:\n\n" + "\n".join(lines)
+                if len(unknown) > len(listed):
+                    suggestion_text += f"\n\n...y {len(unknown) - len(listed)} apariciones más"
+        
         self.suggestions_text.delete("1.0", tk.END)
         self.suggestions_text.insert("1.0", suggestion_text)
-        self.status_label.config(text=f"Revisión completada. {len(suggestions)} errores encontrados")
+        self.status_label.config(
+            text=f"Revisión completada. {len(suggestions)} errores, {len(unknown)} palabras desconocidas"
+                 f"{self.large_file_scope()}")
+        
+    def load_suggester(self):
+        # El índice de sugerencias tarda unos segundos la primera vez: se arma
+        # en un hilo y al terminar se repite la revisión
+        if self.suggester_loading:
+            return
+        self.suggester_loading = True
+        results = queue.Queue()
+        
+        def worker():
+            try:
+                from papiweb_suggest import load_suggester
+                results.put(("done", load_suggester()))
+            except Exception as e:
+                results.put(("error", str(e)))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(100, lambda: self.poll_suggester(results))
+        
+    def poll_suggester(self, results):
+        try:
+            kind, value = results.get_nowait()
+        except queue.Empty:
+            self.root.after(100, lambda: self.poll_suggester(results))
+            return
+        self.suggester_loading = False
+        if kind == "error":
+            self.status_label.config(text=f"Sugerencias no disponibles: {value}")
+            return
+        self.suggester = value
+        self.check_spelling()
+        
+    def on_yscroll(self, first, last):
+        self.text_editor.vbar.set(first, last)
+        # Lo que entra en la vista se revisa cuando termina el desplazamiento
+        self.scheduler.schedule("spelling", self.auto_check_spelling, 100, idle=True)
         
     def auto_check_spelling(self):
-        # Versión ligera para tiempo real
-        self.text_editor.tag_remove("error", "1.0", tk.END)
-        content = self.text_editor.get("1.0", tk.END)
-        words = re.finditer(r'\b\w+\b', content)
-        
-        for match in words:
-            word = match.group().lower()
-            if word in self.spelling_errors:
-                start_pos = f"1.0+{match.start()}c"
-                end_pos = f"1.0+{match.end()}c"
-                self.text_editor.tag_add("error", start_pos, end_pos)
+        # Revisión en tiempo real: sólo las líneas visibles (más un margen)
+        # que no se revisaron desde su último cambio. Las revisadas llevan la
+        # marca "checked", que el proxy quita al editarlas, así abrir o
+        # desplazarse por un documento enorme sólo analiza una pantalla.
+        editor = self.text_editor
+        first = int(editor.index("@0,0").split(".")[0])
+        last = int(editor.index(f"@0,{editor.winfo_height()}").split(".")[0])
+        total = int(editor.index("end-1c").split(".")[0])
+        
+        pending = []
+        for line in range(max(1, first - VIEWPORT_MARGIN), min(total, last + VIEWPORT_MARGIN) + 1):
+            if "checked" in editor.tag_names(f"{line}.0"):
+                continue
+            if pending and pending[-1] == f"{line}.0":
+                pending[-1] = f"{line + 1}.0"
+            else:
+                pending += (f"{line}.0", f"{line + 1}.0")
+        if not pending:
+            return
+        
+        errors = []
+        phrases = []
+        for i in range(0, len(pending), 2):
+            content = editor.get(pending[i], pending[i + 1])
+            analysis = analyze_text(content, self.spelling_errors, self.writing_style)
+            offsets = OffsetIndex(content, int(pending[i].split(".")[0]))
+            errors += offsets.ranges(analysis["spelling_hits"])
+            phrases += offsets.ranges(analysis["style_hits"])
+        tag_ranges_remove(editor, "error", pending)
+        tag_ranges_remove(editor, "suggestion", pending)
+        tag_ranges_add(editor, "error", errors)
+        tag_ranges_add(editor, "suggestion", phrases)
+        tag_ranges_add(editor, "checked", pending)
+        
+    def invalidate_highlights(self):
+        # Cambió el estilo o el diccionario: todas las líneas se vuelven a
+        # revisar a medida que se vean
+        self.text_editor.tag_remove("checked", "1.0", tk.END)
+        self.scheduler.schedule("spelling", self.auto_check_spelling, 100, idle=True)
                 
+    def apply_all_corrections(self):
+        # Aplica de una vez las correcciones del diccionario. Primero se
+        # buscan (en un hilo) las palabras ambiguas del texto para preguntar
+        # qué poner; después se corrige todo en una pasada y se aplica como
+        # una sola edición.
+        if self.large_file is not None:
+            self.status_label.config(text="El archivo grande se abre en modo de solo lectura")
+            return
+        if self.correction is not None:
+            return
+        content = self.text_editor.get("1.0", tk.END + "-1c")
+        results = queue.Queue()
+        self.correction = {"revision": self.edit_revision}
+        spelling_errors = self.spelling_errors
+        
+        def worker():
+            try:
+                results.put(("done", find_ambiguous(content, spelling_errors)))
+            except Exception as e:
+                results.put(("error", str(e)))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.status_label.config(text="Buscando correcciones...")
+        self.root.after(50, lambda: self.poll_correction_choices(results))
+        
+    def poll_correction_choices(self, results):
+        try:
+            kind, value = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, lambda: self.poll_correction_choices(results))
+            return
+        if kind == "error":
+            self.correction = None
+            self.status_label.config(text=f"Error en la corrección: {value}")
+            return
+        choices = {}
+        # Las más frecuentes primero
+        for word, (options, count) in sorted(value.items(), key=lambda item: -item[1][1]):
+            choice = self.ask_correction(word, options, count)
+            if choice is None:
+                self.correction = None
+                self.status_label.config(text="Corrección cancelada")
+                return
+            choices[word] = choice
+        self.start_corrections(choices)
+        
+    def ask_correction(self, word, options, count):
+        # Devuelve la opción elegida, "" para dejar la palabra igual o None
+        # para cancelar
+        dialog = tk.Toplevel(self.root, bg="#34495e")
+        dialog.title("Corrección ambigua")
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+        answer = [None]
+        
+        def choose(value):
+            answer[0] = value
+            dialog.destroy()
+        
+        tk.Label(dialog, text=f"'{word}' aparece {count} vez/veces. ¿Qué corresponde?",
+                bg="#34495e", fg="#ecf0f1", font=("Arial", 10)).pack(padx=15, pady=(15, 10))
+        buttons = tk.Frame(dialog, bg="#34495e")
+        buttons.pack(padx=15, pady=(0, 15))
+        for option in options:
+            tk.Button(buttons, text=option, bg="#3498db", fg="white", font=("Arial", 9, "bold"),
+                     relief=tk.FLAT, command=lambda o=option: choose(o)).pack(side=tk.LEFT, padx=3)
+        tk.Button(buttons, text="Dejar igual", bg="#7f8c8d", fg="white", font=("Arial", 9),
+                 relief=tk.FLAT, command=lambda: choose("")).pack(side=tk.LEFT, padx=3)
+        tk.Button(buttons, text="Cancelar", bg="#e74c3c", fg="white", font=("Arial", 9),
+                 relief=tk.FLAT, command=dialog.destroy).pack(side=tk.LEFT, padx=3)
+        dialog.bind("<Escape>", lambda e: dialog.destroy())
+        dialog.grab_set()
+        self.root.wait_window(dialog)
+        return answer[0]
+        
+    def start_corrections(self, choices):
+        content = self.text_editor.get("1.0", tk.END + "-1c")
+        results = queue.Queue()
+        self.correction = {"revision": self.edit_revision}
+        spelling_errors = self.spelling_errors
+        
+        def worker():
+            try:
+                value = apply_corrections(content, spelling_errors, choices)
+                results.put(("done", value, OffsetIndex(content), len(content)))
+            except Exception as e:
+                results.put(("error", str(e), None, None))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.status_label.config(text="Aplicando correcciones...")
+        self.root.after(50, lambda: self.poll_corrections(choices, results))
+        
+    def poll_corrections(self, choices, results):
+        try:
+            kind, value, offsets, length = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, lambda: self.poll_corrections(choices, results))
+            return
+        if kind == "error":
+            self.correction = None
+            self.status_label.config(text=f"Error en la corrección: {value}")
+            return
+        if self.correction["revision"] != self.edit_revision:
+            # El texto cambió mientras se corregía: se repite sobre el actual
+            # con las mismas elecciones
+            self.start_corrections(choices)
+            return
+        self.correction = None
+        count = self.replace_changed_span(value, offsets, length)
+        self.status_label.config(text=f"{count} corrección(es) aplicada(s)" if count
+                                 else "No hay correcciones para aplicar")
+        
     def change_writing_style(self):
         self.writing_style = self.style_var.get()
-        self.analyze_style()
+        self.invalidate_highlights()
+        self.scheduler.schedule("style", self.analyze_style, 100, idle=True)
         
     def analyze_style(self):
-        content = self.text_editor.get("1.0", tk.END)
+        analysis = self.get_analysis(self.analyze_style)
+        if analysis is None:
+            return
         current_style = self.writing_styles[self.writing_style]
         
         suggestions = [f"Análisis para: {current_style['name']}\n"]
         
-        # Analizar según el estilo seleccionado
-        if self.writing_style == "secundaria":
-            # Buscar palabras muy formales
-            formal_words = ["utilizar", "efectuar", "realizar", "obstante", "por consiguiente"]
-            for word in formal_words:
-                if word in content.lower():
-                    suggestions.append(f"• Considera cambiar '{word}' por algo más simple")
-                    
-        elif self.writing_style == "tecnico":
-            # Buscar términos poco técnicos
-            informal_words = ["cosa", "hacer", "arreglar"]
-            for word in informal_words:
-                if word in content.lower():
-                    suggestions.append(f"• '{word}' podría ser más específico técnicamente")
-                    
-        elif self.writing_style == "universitario":
-            # Buscar expresiones informales
-            informal_phrases = ["muy bueno", "malo", "está bien"]
-            for phrase in informal_phrases:
-                if phrase in content.lower():
-                    suggestions.append(f"• '{phrase}' podría expresarse de forma más académica")
+        # Frases a revisar según el estilo seleccionado
+        for phrase in analysis["style_findings"]:
+            suggestions.append(f"• {style_message(self.writing_style, phrase)}")
         
         # Análisis de conectores
         connectors = current_style["suggestions"]["conectores"]
@@ -572,22 +1515,27 @@ class PapiwebEditor:
         for connector in connectors[:5]:
             suggestions.append(f"• {connector}")
             
-        # Análisis general
-        sentences = content.split('.')
-        avg_length = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
-        
-        if self.writing_style == "secundaria" and avg_length > 20:
-            suggestions.append("\n• Las oraciones son muy largas. Intenta hacerlas más cortas y simples.")
-        elif self.writing_style == "universitario" and avg_length < 10:
-            suggestions.append("\n• Las oraciones son muy cortas. Intenta desarrollar más las ideas.")
+        # Análisis general: legibilidad y largo de las oraciones
+        advice = style_advice(self.writing_style, analysis["avg_sentence_length"],
+                              analysis.get("readability"))
+        if advice:
+            suggestions.append("")
+            suggestions += [f"• {line}" for line in advice]
             
         suggestion_text = "\n".join(suggestions)
         self.suggestions_text.delete("1.0", tk.END)
         self.suggestions_text.insert("1.0", suggestion_text)
         
-        self.status_label.config(text=f"Análisis de estilo completado - {current_style['name']}")
+        self.status_label.config(
+            text=f"Análisis de estilo completado - {current_style['name']}{self.large_file_scope()}")
 
 def main():
+    # Necesario para el pool de procesos en los ejecutables de PyInstaller;
+    # fuera de ellos no hace falta cargar multiprocessing al arrancar
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+    papiweb_startup.mark("imports")
     root = tk.Tk()
     
     # Configurar el ícono y tema
@@ -622,10 +1570,20 @@ def main():
     """
     app.text_editor.insert("1.0", welcome_text)
     app.text_editor.mark_set("insert", "1.0")
+    app.history.clear()
     app.is_modified = False
     
+    if papiweb_startup.active():
+        # Procesar los eventos pendientes dibuja la ventana: primer cuadro
+        root.update()
+        elapsed = papiweb_startup.finish("primer cuadro")
+        app.status_label.config(
+            text=f"Arranque: {elapsed * 1000:.0f} ms (detalle en {papiweb_startup.REPORT_PATH})")
+    
     # Ejecutar la aplicación
     root.mainloop()
+    app.analysis_worker.shutdown()
+    app.tracer.flush()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,92 +1,34 @@
+# El perfil de arranque (--startup-profile) se instala antes que el resto de
+# los imports para poder medirlos
+import papiweb_startup
+papiweb_startup.start()
+
 import os
-import re
-import json
-from datetime import datetime
-import pdfplumber
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+import sys
+
+from papiweb_analysis import analyze_text, count_spelling_errors, style_message
+from papiweb_dictionary import load_spelling_dictionary
+from papiweb_io import atomic_write_text, read_document
+from papiweb_pdf import default_pdf_workers, export_text_to_pdf, extract_pdf_text, iter_pdf_pages
+from papiweb_piecetable import PieceTable
+from papiweb_readability import optional_readability_stats, style_advice
+from papiweb_styles import WRITING_STYLES
 
 class PapiwebEditorConsole:
-    def __init__(self):
+    def __init__(self, dictionaries=()):
         self.current_file = None
-        self.content = ""
-        self.spelling_errors = {
-            "aver": "a ver",
-            "haber": "a ver",
-            "ay": "ahí/hay/¡ay!",
-            "ahi": "ahí",
-            "ahy": "ahí",
-            "haver": "a ver",
-            "echo": "hecho",
-            "asta": "hasta",
-            "ace": "hace",
-            "ase": "hace",
-            "asia": "hacia",
-            "porke": "porque",
-            "xq": "porque",
-            "q": "que",
-            "k": "que",
-            "bn": "bien",
-            "tbn": "también",
-            "tmb": "también",
-            "x": "por",
-            "xfa": "por favor",
-            "plis": "por favor",
-            "salu2": "saludos",
-            "grax": "gracias",
-            "gracias": "gracias",
-            "deveria": "debería",
-            "tendria": "tendría",
-            "podria": "podría",
-            "sabria": "sabría",
-            "estaria": "estaría"
-        }
-        self.writing_styles = {
-            "secundaria": {
-                "name": "Estudiante Secundario BA",
-                "suggestions": {
-                    "palabras_formales": {
-                        "utilizar": "usar",
-                        "efectuar": "hacer",
-                        "realizar": "hacer",
-                        "obstante": "pero",
-                        "por consiguiente": "entonces",
-                        "por ende": "entonces"
-                    },
-                    "conectores": ["entonces", "después", "también", "pero", "y", "o", "porque"],
-                    "tone": "informal_juvenil"
-                }
-            },
-            "tecnico": {
-                "name": "Desarrollador Técnico",
-                "suggestions": {
-                    "palabras_tecnicas": {
-                        "programa": "aplicación/software",
-                        "hacer": "implementar/desarrollar",
-                        "arreglar": "debuggear/resolver",
-                        "cosa": "componente/módulo",
-                        "problema": "bug/issue"
-                    },
-                    "conectores": ["por lo tanto", "además", "sin embargo", "en consecuencia", "dado que"],
-                    "tone": "tecnico_preciso"
-                }
-            },
-            "universitario": {
-                "name": "Nivel Universitario",
-                "suggestions": {
-                    "palabras_academicas": {
-                        "muy bueno": "excelente",
-                        "malo": "deficiente",
-                        "pensar": "considerar/analizar",
-                        "decir": "expresar/manifestar",
-                        "ver": "observar/analizar"
-                    },
-                    "conectores": ["no obstante", "por consiguiente", "asimismo", "en virtud de", "en este sentido"],
-                    "tone": "academico_formal"
-                }
-            }
-        }
+        # El documento vive en una tabla de trozos; content lo arma como str
+        # sólo cuando hace falta y lo guarda hasta la próxima edición
+        self.document = PieceTable()
+        self.content_cache = ""
+        self.pdf_workers = default_pdf_workers()
+        self.suggester = None
+        self.dictionaries = list(dictionaries)
+        self.spelling_errors = load_spelling_dictionary(self.dictionaries)
+        self.writing_styles = WRITING_STYLES
         self.writing_style = "secundaria"
+        self.analysis_key = None
+        self.analysis = None
 
     def menu(self):
         self.show_banner()
@@ -101,7 +43,13 @@ class PapiwebEditorConsole:
             print("7. Verificar ortografía")
             print("8. Análisis de estilo")
             print("9. Cambiar estilo de redacción (actual: {} )".format(self.writing_styles[self.writing_style]["name"]))
+            print("10. Cargar diccionario (entradas: {})".format(len(self.spelling_errors)))
+            print("11. Agregar texto al final")
+            print("12. Insertar texto en una línea")
+            print("13. Buscar y reemplazar")
+            print("14. Aplicar todas las correcciones")
             print("0. Salir")
+            papiweb_startup.finish("primer menú")
             choice = input("Seleccione una opción: ")
             if choice == "1":
                 self.new_document()
@@ -121,6 +69,16 @@ class PapiwebEditorConsole:
                 self.analyze_style()
             elif choice == "9":
                 self.change_writing_style()
+            elif choice == "10":
+                self.load_dictionary()
+            elif choice == "11":
+                self.append_text()
+            elif choice == "12":
+                self.insert_at_line()
+            elif choice == "13":
+                self.search_replace()
+            elif choice == "14":
+                self.apply_all_corrections()
             elif choice == "0":
                 print("¡Hasta luego!")
                 break
@@ -136,6 +94,20 @@ class PapiwebEditorConsole:
 Copyright © 2025 Papiweb
 """)
 
+    @property
+    def content(self):
+        if self.content_cache is None:
+            self.content_cache = self.document.get_text()
+        return self.content_cache
+
+    @content.setter
+    def content(self, text):
+        self.document = PieceTable(text)
+        self.content_cache = text
+
+    def changed(self):
+        self.content_cache = None
+
     def new_document(self):
         self.content = ""
         self.current_file = None
@@ -153,23 +125,35 @@ Copyright © 2025 Papiweb
             print(f"Error al abrir archivo: {e}")
 
     def import_from_pdf(self):
+        from papiweb_pdf_cache import default_cache
+
         path = input("Ingrese la ruta del archivo PDF: ")
+        workers = input(f"Procesos de extracción [{self.pdf_workers}]: ").strip()
         try:
-            with pdfplumber.open(path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-            self.content = text
+            if workers:
+                self.pdf_workers = max(1, min(int(workers), default_pdf_workers()))
+            cache = default_cache()
+            pages = []
+            for number, total, text in iter_pdf_pages(path, workers=self.pdf_workers,
+                                                      cache=cache):
+                pages.append(text)
+                print(f"\rPágina {number + 1} de {total}", end="", flush=True)
+            if pages:
+                print()
+            self.content = "".join(pages)
             self.current_file = None
             print(f"PDF '{path}' importado.")
+            if cache is not None:
+                stats = cache.stats()
+                print(f"Caché: {stats['hits']} aciertos, {stats['misses']} fallos.")
         except Exception as e:
             print(f"Error al importar PDF: {e}")
 
     def save_text_file(self):
         path = input("Ingrese la ruta para guardar el archivo de texto: ")
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(self.content)
+            # Se escribe recorriendo la tabla por bloques, sin armar el texto
+            atomic_write_text(path, self.document.iter_chunks())
             self.current_file = path
             print(f"Archivo guardado en '{path}'.")
         except Exception as e:
@@ -178,52 +162,73 @@ Copyright © 2025 Papiweb
     def export_to_pdf(self):
         path = input("Ingrese la ruta para guardar el PDF: ")
         try:
-            c = canvas.Canvas(path, pagesize=letter)
-            width, height = letter
-            margin = 40
-            y = height - margin
-            for line in self.content.split('\n'):
-                c.drawString(margin, y, line)
-                y -= 15
-                if y < margin:
-                    c.showPage()
-                    y = height - margin
-            c.save()
-            print(f"PDF guardado en '{path}'.")
+            pages = export_text_to_pdf(self.document.iter_lines(), path)
+            print(f"PDF guardado en '{path}' ({pages} páginas).")
         except Exception as e:
             print(f"Error al exportar PDF: {e}")
 
+    def get_analysis(self):
+        # Una sola pasada sobre el texto alimenta estadísticas, ortografía y
+        # estilo; si el documento no cambió se reutiliza el último resultado
+        key = (self.content, self.writing_style)
+        if key != self.analysis_key:
+            self.analysis = analyze_text(self.content, self.spelling_errors, self.writing_style)
+            self.analysis_key = key
+        return self.analysis
+
     def show_stats(self):
-        words = len(self.content.split())
-        chars = len(self.content)
-        paragraphs = len([p for p in self.content.split('\n') if p.strip()])
-        errors = self.count_spelling_errors(self.content)
-        print(f"Palabras: {words}")
-        print(f"Caracteres: {chars}")
-        print(f"Párrafos: {paragraphs}")
-        print(f"Errores ortográficos: {errors}")
+        analysis = self.get_analysis()
+        print(f"Palabras: {analysis['words']}")
+        print(f"Caracteres: {analysis['characters']}")
+        print(f"Párrafos: {analysis['paragraphs']}")
+        print(f"Errores ortográficos: {len(analysis['spelling_hits'])}")
 
     def count_spelling_errors(self, text):
-        words = re.findall(r'\b\w+\b', text.lower())
-        error_count = 0
-        for word in words:
-            if word in self.spelling_errors:
-                error_count += 1
-        return error_count
+        return count_spelling_errors(text, self.spelling_errors)
 
     def check_spelling(self):
-        words = re.findall(r'\b\w+\b', self.content)
-        suggestions = []
-        for word in words:
-            lw = word.lower()
-            if lw in self.spelling_errors:
-                suggestions.append(f"'{word}' → {self.spelling_errors[lw]}")
+        suggestions = [f"'{word}' → {suggestion}"
+                       for _, _, word, suggestion in self.get_analysis()["spelling_hits"]]
         if suggestions:
             print("Errores encontrados:")
             for s in suggestions:
                 print("-", s)
         else:
             print("No se encontraron errores ortográficos.")
+        suggester = self.get_suggester()
+        if suggester is None:
+            return
+        from papiweb_suggest import find_unknown_words
+        unknown = {}
+        for _, _, word in find_unknown_words(self.content, suggester, self.spelling_errors):
+            unknown[word.lower()] = unknown.get(word.lower(), 0) + 1
+        if unknown:
+            print(f"Palabras desconocidas ({len(unknown)}):")
+            for word, count in list(unknown.items())[:50]:
+                options = ", ".join(option for option, _ in suggester.lookup(word, 3))
+                print(f"- '{word}' (x{count}) → {options or 'sin sugerencias'}")
+            if len(unknown) > 50:
+                print(f"...y {len(unknown) - 50} más")
+
+    def get_suggester(self):
+        if self.suggester is None:
+            print("Preparando sugerencias...")
+            try:
+                from papiweb_suggest import load_suggester
+                self.suggester = load_suggester()
+            except Exception as e:
+                print(f"Sugerencias no disponibles: {e}")
+        return self.suggester
+
+    def load_dictionary(self):
+        path = input("Ingrese la ruta del diccionario (.txt/.tsv/.json): ")
+        try:
+            self.spelling_errors = load_spelling_dictionary(self.dictionaries + [path])
+            self.dictionaries.append(path)
+            self.analysis_key = None
+            print(f"Diccionario cargado: {len(self.spelling_errors)} entradas.")
+        except Exception as e:
+            print(f"Error al cargar diccionario: {e}")
 
     def change_writing_style(self):
         print("Estilos disponibles:")
@@ -237,37 +242,74 @@ Copyright © 2025 Papiweb
             print("Estilo inválido.")
 
     def analyze_style(self):
+        analysis = self.get_analysis()
         current_style = self.writing_styles[self.writing_style]
         suggestions = [f"Análisis para: {current_style['name']}"]
-        content = self.content
-        if self.writing_style == "secundaria":
-            formal_words = ["utilizar", "efectuar", "realizar", "obstante", "por consiguiente"]
-            for word in formal_words:
-                if word in content.lower():
-                    suggestions.append(f"• Considera cambiar '{word}' por algo más simple")
-        elif self.writing_style == "tecnico":
-            informal_words = ["cosa", "hacer", "arreglar"]
-            for word in informal_words:
-                if word in content.lower():
-                    suggestions.append(f"• '{word}' podría ser más específico técnicamente")
-        elif self.writing_style == "universitario":
-            informal_phrases = ["muy bueno", "malo", "está bien"]
-            for phrase in informal_phrases:
-                if phrase in content.lower():
-                    suggestions.append(f"• '{phrase}' podría expresarse de forma más académica")
+        for phrase in analysis["style_findings"]:
+            suggestions.append(f"• {style_message(self.writing_style, phrase)}")
         connectors = current_style["suggestions"]["conectores"]
         suggestions.append("Conectores sugeridos para este estilo:")
         for connector in connectors[:5]:
             suggestions.append(f"• {connector}")
-        sentences = content.split('.')
-        avg_length = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
-        if self.writing_style == "secundaria" and avg_length > 20:
-            suggestions.append("Las oraciones son muy largas. Intenta hacerlas más cortas y simples.")
-        elif self.writing_style == "universitario" and avg_length < 10:
-            suggestions.append("Las oraciones son muy cortas. Intenta desarrollar más las ideas.")
+        readability = optional_readability_stats(self.content)
+        suggestions += style_advice(self.writing_style, analysis["avg_sentence_length"], readability)
         print("\n".join(suggestions))
 
-    def edit_content(self):
+    def search_replace(self):
+        import re
+        from papiweb_offsets import OffsetIndex
+        from papiweb_search import SearchQuery
+
+        query = input("Buscar: ")
+        if not query:
+            return
+        regex = input("¿Expresión regular? (s/n): ").strip().lower() == "s"
+        ignore_case = input("¿Distinguir mayúsculas? (s/n): ").strip().lower() != "s"
+        try:
+            search = SearchQuery(query, regex, ignore_case)
+        except re.error as e:
+            print(f"Expresión regular inválida: {e}")
+            return
+        content = self.content
+        hits = search.find_all(content)
+        if not hits:
+            print("Sin coincidencias.")
+            return
+        offsets = OffsetIndex(content)
+        print(f"{len(hits)} coincidencia(s):")
+        for start, end in hits[:20]:
+            line, column = offsets.index(start).split(".")
+            context = content[max(0, start - 30):end + 30].replace("\n", " ")
+            print(f"- línea {line}, columna {int(column) + 1}: ...{context}...")
+        if len(hits) > 20:
+            print(f"...y {len(hits) - 20} más")
+        if input("¿Reemplazar todas? (s/n): ").strip().lower() != "s":
+            return
+        replacement = input("Reemplazar por: ")
+        new_text, count, _, _ = search.replace_all(content, replacement)
+        self.content = new_text
+        print(f"{count} reemplazo(s).")
+
+    def apply_all_corrections(self):
+        from papiweb_autocorrect import apply_corrections, find_ambiguous
+
+        content = self.content
+        choices = {}
+        ambiguous = sorted(find_ambiguous(content, self.spelling_errors).items(),
+                           key=lambda item: -item[1][1])
+        for word, (options, count) in ambiguous:
+            print(f"\n'{word}' aparece {count} vez/veces. ¿Qué corresponde?")
+            for number, option in enumerate(options, 1):
+                print(f"{number}. {option}")
+            answer = input("Opción (Enter = dejar igual): ").strip()
+            if answer.isdigit() and 1 <= int(answer) <= len(options):
+                choices[word] = options[int(answer) - 1]
+        new_text, count, _, _ = apply_corrections(content, self.spelling_errors, choices)
+        if count:
+            self.content = new_text
+        print(f"{count} corrección(es) aplicada(s).")
+
+    def read_text(self):
         print("Ingrese el texto (finalice con una línea vacía):")
         lines = []
         while True:
@@ -275,8 +317,274 @@ Copyright © 2025 Papiweb
             if line == "":
                 break
             lines.append(line)
-        self.content = "\n".join(lines)
+        return "\n".join(lines)
+
+    def edit_content(self):
+        self.content = self.read_text()
+
+    def append_text(self):
+        text = self.read_text()
+        if not text:
+            return
+        if len(self.document) and self.document.get_text(len(self.document) - 1) != "\n":
+            text = "\n" + text
+        self.document.append(text)
+        self.changed()
+        print(f"Texto agregado. El documento tiene {self.document.line_count()} líneas.")
+
+    def insert_at_line(self):
+        total = self.document.line_count()
+        line = input(f"Número de línea (1-{total + 1}): ").strip()
+        try:
+            line = int(line)
+        except ValueError:
+            print("Número de línea inválido.")
+            return
+        if not 1 <= line <= total + 1:
+            print("Número de línea inválido.")
+            return
+        text = self.read_text()
+        if not text:
+            return
+        if line > total:
+            # Después de la última línea: equivale a agregar al final
+            self.document.append("\n" + text if len(self.document) else text)
+        else:
+            self.document.insert_at_line(line - 1, text + "\n")
+        self.changed()
+        print(f"Texto insertado en la línea {line}.")
+
+
+# Modo por lotes: cada subcomando procesa muchos archivos en un pool de
+# procesos y emite un objeto JSON por línea en stdout
+BATCH_COMMANDS = {
+    "stats": "Estadísticas del texto",
+    "spell": "Errores ortográficos con su corrección sugerida",
+    "style": "Análisis de estilo de redacción",
+    "pdf2txt": "Extraer el texto de PDFs a archivos .txt",
+    "txt2pdf": "Exportar archivos de texto a PDF",
+    "fix": "Aplicar las correcciones del diccionario y guardar el texto corregido",
+    "corpus": "Informe combinado de ortografía y estilo de una carpeta completa",
+}
+
+_batch_editor = None
+
+
+def output_path(path, output_dir, extension):
+    name = os.path.splitext(os.path.basename(path))[0] + extension
+    return os.path.join(output_dir or os.path.dirname(path), name)
+
+
+def run_batch_job(job):
+    # Corre en un proceso del pool: un editor por proceso, reutilizado
+    global _batch_editor
+    command, path, options = job
+    if _batch_editor is None:
+        _batch_editor = PapiwebEditorConsole(options["dictionaries"])
+    editor = _batch_editor
+    record = {"command": command, "file": path}
+    try:
+        if command == "pdf2txt":
+            target = output_path(path, options["output_dir"], ".txt")
+            record["output"] = target
+            record["characters"] = atomic_write_text(target, extract_pdf_text(path))
+        elif command == "txt2pdf":
+            target = output_path(path, options["output_dir"], ".pdf")
+            record["output"] = target
+            record["pages"] = export_text_to_pdf(read_document(path), target)
+        elif command == "fix":
+            from papiweb_autocorrect import apply_corrections, find_ambiguous
+            content = read_document(path)
+            choices = options["choices"]
+            new_text, count, _, _ = apply_corrections(content, editor.spelling_errors, choices)
+            target = output_path(path, options["output_dir"], "_corregido.txt")
+            atomic_write_text(target, new_text)
+            record["output"] = target
+            record["corrections"] = count
+            # Ambiguas sin una opción elegida con --choose: quedan como estaban
+            record["skipped"] = sorted(word for word in find_ambiguous(content, editor.spelling_errors)
+                                       if word not in choices)
+        else:
+            editor.content = read_document(path)
+            editor.writing_style = options["style"]
+            analysis = editor.get_analysis()
+            if command == "stats":
+                record.update(
+                    words=analysis["words"],
+                    characters=analysis["characters"],
+                    paragraphs=analysis["paragraphs"],
+                    sentences=analysis["sentences"],
+                    spelling_errors=len(analysis["spelling_hits"]),
+                )
+            elif command == "spell":
+                record["errors"] = [
+                    {"word": word, "suggestion": suggestion, "offset": start}
+                    for start, _, word, suggestion in analysis["spelling_hits"]
+                ]
+            else:
+                record["style"] = options["style"]
+                record["findings"] = [
+                    {"phrase": phrase, "message": style_message(options["style"], phrase)}
+                    for phrase in analysis["style_findings"]
+                ]
+                record["style_hits"] = len(analysis["style_hits"])
+                record["avg_sentence_length"] = round(analysis["avg_sentence_length"], 2)
+                readability = optional_readability_stats(editor.content)
+                if readability is not None:
+                    record["readability"] = {
+                        "szigriszt_pazos": round(readability["szigriszt_pazos"], 1),
+                        "fernandez_huerta": round(readability["fernandez_huerta"], 1),
+                        "inflesz": readability["inflesz"],
+                        "sentences": readability["sentences"],
+                        "avg_sentence_length": round(readability["avg_sentence_length"], 2),
+                        "long_sentences": readability["long_sentence_count"],
+                    }
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+
+def expand_paths(patterns):
+    import glob
+
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if matches:
+            paths.extend(path for path in matches if os.path.isfile(path))
+        else:
+            # Un patrón sin coincidencias se deja tal cual para reportar el error
+            paths.append(pattern)
+    return paths
+
+
+def run_batch(args):
+    import json
+
+    options = {"style": getattr(args, "style", "secundaria"),
+               "output_dir": getattr(args, "output_dir", None),
+               "dictionaries": getattr(args, "dict", None) or [],
+               "choices": dict(getattr(args, "choose", None) or [])}
+    jobs = [(args.command, path, options) for path in expand_paths(args.files)]
+    if options["output_dir"]:
+        os.makedirs(options["output_dir"], exist_ok=True)
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    pool = None
+    if args.workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=args.workers)
+        chunksize = max(1, min(32, len(jobs) // (args.workers * 4)))
+        results = pool.map(run_batch_job, jobs, chunksize=chunksize)
+    else:
+        results = map(run_batch_job, jobs)
+
+    failed = 0
+    try:
+        for record in results:
+            failed += "error" in record
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+    except BrokenPipeError:
+        # El consumidor cerró la tubería (p. ej. "| head"): terminar sin traza
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return 1 if failed else 0
+
+
+def run_corpus_command(args):
+    import json
+    from papiweb_corpus import run_corpus
+
+    checkpoint = args.checkpoint or f"papiweb_corpus_{args.style}.manifest.jsonl"
+
+    def progress(done, total, record):
+        status = "error" if "error" in record else "ok"
+        print(f"[{done}/{total}] {status} {record['file']}", file=sys.stderr, flush=True)
+
+    try:
+        # Con un índice compilado, cada proceso del pool sólo lo vuelve a mapear
+        spelling_errors = load_spelling_dictionary(args.dict or [])
+        report = run_corpus(args.directory, spelling_errors, args.style,
+                            checkpoint, workers=args.workers, progress=progress)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        atomic_write_text(args.output, text + "\n")
+    else:
+        if hasattr(sys.stdout, "reconfigure"):
+            sys.stdout.reconfigure(encoding="utf-8")
+        print(text)
+    return 1 if report["failed"] else 0
+
+
+def parse_choice(value):
+    import argparse
+
+    word, separator, option = value.partition("=")
+    if not separator or not word:
+        raise argparse.ArgumentTypeError(f"se esperaba PALABRA=OPCIÓN: {value}")
+    return word.strip().lower(), option.strip()
+
+
+def main(argv=None):
+    argv = [arg for arg in (sys.argv[1:] if argv is None else argv) if arg != papiweb_startup.FLAG]
+    if not argv:
+        # El menú interactivo no necesita argparse
+        PapiwebEditorConsole().menu()
+        return 0
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="papiweb_editor_console",
+        description="PAPIWEB Editor Console. Sin subcomando abre el menú interactivo.")
+    subparsers = parser.add_subparsers(dest="command")
+    for command, help_text in BATCH_COMMANDS.items():
+        sub = subparsers.add_parser(command, help=help_text)
+        if command == "corpus":
+            sub.add_argument("directory", help="carpeta raíz del corpus (.txt y .pdf)")
+            sub.add_argument("--checkpoint",
+                             help="manifiesto para retomar una corrida interrumpida")
+            sub.add_argument("--output", help="archivo JSON del informe (por defecto, stdout)")
+        else:
+            sub.add_argument("files", nargs="+", help="archivos o patrones glob (admite **)")
+        sub.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                         help="procesos en paralelo (por defecto, uno por núcleo)")
+        if command in ("style", "corpus"):
+            sub.add_argument("--style", choices=sorted(WRITING_STYLES), default="secundaria",
+                             help="estilo de redacción")
+        if command in ("stats", "spell", "style", "corpus", "fix"):
+            sub.add_argument("--dict", action="append", metavar="ARCHIVO",
+                             help="diccionario adicional (.txt/.tsv/.json); se puede repetir")
+        if command in ("pdf2txt", "txt2pdf", "fix"):
+            sub.add_argument("--output-dir", help="carpeta de salida (por defecto, junto al original)")
+        if command == "fix":
+            sub.add_argument("--choose", action="append", type=parse_choice,
+                             metavar="PALABRA=OPCIÓN",
+                             help="corrección para una entrada ambigua (vacía = dejar igual); "
+                                  "se puede repetir")
+    args = parser.parse_args(argv)
+    papiweb_startup.finish("argumentos procesados")
+
+    if args.command is None:
+        PapiwebEditorConsole().menu()
+        return 0
+    if args.command == "corpus":
+        return run_corpus_command(args)
+    return run_batch(args)
+
 
 if __name__ == "__main__":
-    editor = PapiwebEditorConsole()
-    editor.menu()
+    # Necesario para el pool de procesos en los ejecutables de PyInstaller;
+    # fuera de ellos no hace falta cargar multiprocessing al arrancar
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import os
+
+# Caracteres que se escriben (o se pasan al hash) por bloque
+CHUNK_CHARS = 1024 * 1024
+
+
+def iter_chunks(text, size=CHUNK_CHARS):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def read_document(path):
+    # Texto de un .txt o de un PDF, según la extensión
+    if path.lower().endswith(".pdf"):
+        from papiweb_pdf import extract_pdf_text
+        return extract_pdf_text(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def content_hash(text):
+    # Por bloques para no duplicar en memoria un documento grande al codificarlo
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in iter_chunks(text):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def atomic_write_text(path, content, encoding="utf-8", progress=None):
+    # Escribe en un temporal del mismo directorio, lo sincroniza a disco y
+    # recién entonces lo renombra sobre el destino: un corte a mitad de camino
+    # deja el archivo anterior intacto. content puede ser un str o un
+    # iterable de bloques de texto.
+    import shutil
+    import tempfile
+
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    chunks = iter_chunks(content) if isinstance(content, str) else content
+    total = len(content) if isinstance(content, str) else None
+
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp",
+                                     dir=directory)
+    try:
+        written = 0
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+                if progress is not None:
+                    progress(written, total)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        else:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    _fsync_directory(directory)
+    return written
+
+
+def _fsync_directory(directory):
+    # Asegura que el renombrado quede registrado (no disponible en Windows)
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,91 @@
+import mmap
+import os
+import threading
+from array import array
+
+# A partir de este tamaño el editor abre el archivo en modo "archivo grande"
+LARGE_FILE_BYTES = 32 * 1024 * 1024
+# Bloque que el indexador lee de una vez del mapa de memoria
+INDEX_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+# Índice de inicios de línea de un archivo mapeado en memoria. Se arma en un
+# hilo aparte; mientras tanto ya se pueden leer las líneas indexadas. Sólo se
+# decodifica el rango pedido, así la memoria usada no depende del tamaño del
+# archivo más que por el índice (8 bytes por línea).
+class LineIndex:
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self.file = open(path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.offsets = array("q", [0])
+        self.indexed_bytes = 0
+        self.complete = self.size == 0
+        self.closed = False
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        if not self.complete:
+            self.thread = threading.Thread(target=self._build, daemon=True)
+            self.thread.start()
+
+    def _build(self):
+        position = 0
+        while position < self.size and not self.closed:
+            chunk = self.map[position:position + INDEX_CHUNK_BYTES]
+            found = array("q")
+            newline = chunk.find(b"\n")
+            while newline != -1:
+                found.append(position + newline + 1)
+                newline = chunk.find(b"\n", newline + 1)
+            position += len(chunk)
+            with self.lock:
+                self.offsets.extend(found)
+                self.indexed_bytes = position
+        with self.lock:
+            self.complete = not self.closed
+
+    def progress(self):
+        return self.indexed_bytes / self.size if self.size else 1.0
+
+    def line_count(self):
+        # Mientras se indexa, la última línea todavía no tiene fin conocido
+        with self.lock:
+            return len(self.offsets) if self.complete else len(self.offsets) - 1
+
+    def get_lines(self, first, count):
+        if self.map is None:
+            return ""
+        with self.lock:
+            available = len(self.offsets) if self.complete else len(self.offsets) - 1
+            last = min(first + count, available)
+            if first >= last:
+                return ""
+            start = self.offsets[first]
+            end = self.offsets[last] if last < len(self.offsets) else self.size
+        text = self.map[start:end].decode(self.encoding, errors="replace")
+        if "\r" in text:
+            # Igual que open() en modo texto: los CRLF llegan al editor como \n
+            text = text.replace("\r\n", "\n")
+        return text[:-1] if text.endswith("\n") else text
+
+    def close(self):
+        self.closed = True
+        if self.thread is not None:
+            self.thread.join()
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+
+def iter_file_lines(path, encoding="utf-8"):
+    # Todas las líneas del archivo, sin su salto, leyendo de a una: para
+    # recorrer el documento completo (p. ej. exportarlo) sin cargarlo entero.
+    # Abre el archivo por su cuenta, así no depende de que el LineIndex del
+    # editor siga abierto, y open() traduce los CRLF como en el modo normal.
+    with open(path, "r", encoding=encoding, errors="replace") as f:
+        for line in f:
+            yield line[:-1] if line.endswith("\n") else line
@@ -0,0 +1,67 @@
+from collections import deque
+
+
+# Autómata Aho-Corasick sobre palabras (no sobre caracteres): cada frase se
+# parte en palabras, así las coincidencias respetan los límites de palabra
+# ("malo" no aparece dentro de "malograr") y el texto se recorre una sola vez
+# sin importar cuántas frases haya.
+class PhraseMatcher:
+    def __init__(self, phrases):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        self.max_words = 0
+
+        for phrase in phrases:
+            words = phrase.lower().split()
+            if not words:
+                continue
+            state = 0
+            for word in words:
+                next_state = self.goto[state].get(word)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][word] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = next_state
+            self.output[state] += ((phrase, len(words)),)
+            self.max_words = max(self.max_words, len(words))
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(word, 0)
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def __len__(self):
+        return len(self.goto) - 1
+
+    def step(self, state, word):
+        # Avanza el autómata con una palabra ya en minúsculas y devuelve el
+        # nuevo estado; las frases reconocidas quedan en self.output[estado]
+        goto = self.goto
+        while state and word not in goto[state]:
+            state = self.fail[state]
+        return goto[state].get(word, 0)
+
+    def find_all(self, tokens):
+        # tokens: iterable de (inicio, fin, palabra en minúsculas)
+        hits = []
+        starts = deque(maxlen=max(self.max_words, 1))
+        state = 0
+        for start, end, word in tokens:
+            starts.append(start)
+            state = self.step(state, word)
+            for phrase, length in self.output[state]:
+                hits.append((starts[-length], end, phrase))
+        return hits
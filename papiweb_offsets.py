@@ -0,0 +1,46 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+# Rangos por llamada a "tag add"/"tag remove": Tk acepta listas de cualquier
+# largo, pero así ninguna llamada arma un comando Tcl gigante
+TAG_BATCH = 10000
+
+
+# Convierte posiciones de carácter de un texto en índices Tk "línea.columna".
+# Un índice "1.0+Nc" obliga a Tk a recorrer el buffer desde el principio en
+# cada llamada; con los inicios de línea precalculados cada conversión es una
+# búsqueda binaria.
+class OffsetIndex:
+    def __init__(self, text, first_line=1, first_column=0):
+        # first_line/first_column: índice Tk donde empieza text en el widget
+        self.first_line = first_line
+        self.first_column = first_column
+        self.starts = list(accumulate((len(line) + 1 for line in text.split("\n")), initial=0))
+        self.starts.pop()
+
+    def index(self, offset):
+        line = bisect_right(self.starts, offset) - 1
+        column = offset - self.starts[line]
+        if line == 0:
+            column += self.first_column
+        return f"{line + self.first_line}.{column}"
+
+    def ranges(self, spans):
+        # (inicio, fin, ...) -> lista plana de índices inicio, fin, inicio, fin...
+        # lista para pasarla a tag_ranges_add
+        indexes = []
+        for span in spans:
+            indexes.append(self.index(span[0]))
+            indexes.append(self.index(span[1]))
+        return indexes
+
+
+def tag_ranges_add(widget, tag, indexes):
+    # Un solo "tag add" con muchos rangos en lugar de uno por rango
+    for i in range(0, len(indexes), 2 * TAG_BATCH):
+        widget.tk.call(widget._w, "tag", "add", tag, *indexes[i:i + 2 * TAG_BATCH])
+
+
+def tag_ranges_remove(widget, tag, indexes):
+    for i in range(0, len(indexes), 2 * TAG_BATCH):
+        widget.tk.call(widget._w, "tag", "remove", tag, *indexes[i:i + 2 * TAG_BATCH])
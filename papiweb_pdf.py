@@ -0,0 +1,301 @@
+import os
+
+# Por debajo de este número de páginas no compensa levantar procesos
+PARALLEL_MIN_PAGES = 40
+# Páginas que extrae cada tarea del pool; tareas chicas reparten mejor la
+# carga. Las primeras páginas no esperan al pool: las extrae el proceso que
+# ya tiene el PDF abierto (ver _PageExtractor).
+SHARD_PAGES = 16
+
+# Formato de exportación: Helvetica 12 con interlineado de 15 puntos
+EXPORT_FONT = "Helvetica"
+EXPORT_FONT_SIZE = 12
+EXPORT_LEADING = 15
+EXPORT_MARGIN = 40
+
+
+def default_pdf_workers():
+    return os.cpu_count() or 1
+
+
+def iter_pdf_pages(path, cancel_event=None, workers=1, cache=None):
+    # Genera (número de página, total de páginas, texto) a medida que se
+    # extrae cada página: quien consume puede mostrar la primera sin esperar
+    # al resto y cancelar a mitad de camino
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    file_hash = None
+    previous = False
+    if cache is not None:
+        # Buscar páginas por contenido sólo sirve si ya se importó alguna
+        # versión de este archivo: uno nunca visto no puede coincidir
+        previous = cache.has_path(path)
+        file_hash = cache.file_hash(path)
+        texts = cache.get_document(file_hash)
+        if texts is not None:
+            # Archivo sin cambios: no hace falta abrir el PDF
+            for number, text in enumerate(texts):
+                if cancelled():
+                    return
+                yield number, len(texts), text
+            return
+
+    # Más procesos que núcleos sólo compiten entre sí
+    workers = max(1, min(workers, default_pdf_workers()))
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        total = len(pdf.pages)
+        if cache is not None:
+            cache.start_document(file_hash, total)
+        # (hash, texto ya extraído o None) de cada página, calculado recién al
+        # llegar a ella o al repartir su tramo al pool
+        looked_up = {}
+
+        def lookup(number):
+            found = looked_up.get(number)
+            if found is None:
+                digest = text = None
+                if cache is not None:
+                    digest = page_digest(pdf.pages[number])
+                    if previous:
+                        text = cache.get_by_digests([digest]).get(digest)
+                found = looked_up[number] = (digest, text)
+            return found
+
+        if previous:
+            is_missing = lambda number: lookup(number)[1] is None
+        else:
+            is_missing = lambda number: True
+        extractor = _PageExtractor(pdf, path, total, workers, cancel_event, is_missing)
+        try:
+            for number in range(total):
+                if cancelled():
+                    return
+                digest, text = lookup(number)
+                del looked_up[number]
+                extracted = text is None
+                if extracted:
+                    text = extractor.get(number)
+                    if text is None:
+                        return
+                # Libera los objetos de la página ya procesada
+                pdf.pages[number].close()
+                if cache is not None:
+                    cache.put_page(file_hash, number, digest, text, extracted)
+                yield number, total, text
+        finally:
+            extractor.close()
+            if cache is not None:
+                cache.flush()
+
+
+class _PageExtractor:
+    # Extrae las páginas que faltan, en orden. Con workers > 1 y un PDF
+    # largo reparte tramos de páginas a un pool de procesos. Cada proceso
+    # tiene que volver a abrir y analizar el PDF antes de entregar su primer
+    # tramo, así que el primer tramo lo extrae este proceso del PDF ya
+    # abierto. También extrae cualquier tramo que todavía no haya tomado
+    # ningún proceso cuando se lo necesita. Por eso el pool usa un proceso
+    # menos que workers.
+    def __init__(self, pdf, path, total, workers, cancel_event, is_missing):
+        self.pdf = pdf
+        self.path = path
+        self.total = total
+        self.workers = workers
+        self.cancel_event = cancel_event
+        self.is_missing = is_missing
+        self.parallel = workers > 1 and total >= PARALLEL_MIN_PAGES
+        self.shard = max(1, min(SHARD_PAGES, -(-total // (workers * 4))))
+        # Primera página que todavía no se repartió al pool
+        self.next_page = self.shard
+        self.pending = {}  # página -> (tramo, futuro)
+        self.pool = None
+
+    def get(self, number):
+        # Texto de la página, o None si se canceló mientras se esperaba
+        entry = self.pending.pop(number, None)
+        if entry is None:
+            text = self.pdf.pages[number].extract_text() or ""
+        else:
+            chunk, future = entry
+            if future.cancel():
+                for other in chunk:
+                    self.pending.pop(other, None)
+                text = self.pdf.pages[number].extract_text() or ""
+            else:
+                texts = self.wait(future)
+                if texts is None:
+                    return None
+                text = texts[chunk.index(number)]
+        # La primera página sale antes de que los procesos nuevos compitan
+        # por la CPU
+        self.submit(number + 1)
+        return text
+
+    def submit(self, position):
+        # Reparte los tramos hasta unos pocos por delante de position
+        if not self.parallel:
+            return
+        from concurrent.futures import ProcessPoolExecutor
+        end = min(self.total, position + 2 * self.workers * self.shard)
+        while self.next_page < end:
+            first = self.next_page
+            self.next_page = min(first + self.shard, self.total)
+            chunk = [number for number in range(first, self.next_page) if self.is_missing(number)]
+            if not chunk:
+                continue
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=max(1, self.workers - 1))
+            future = self.pool.submit(_extract_pages, self.path, chunk)
+            for number in chunk:
+                self.pending[number] = (chunk, future)
+
+    def wait(self, future):
+        from concurrent.futures import TimeoutError
+        while True:
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                return None
+            try:
+                return future.result(timeout=0.2)
+            except TimeoutError:
+                continue
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _extract_pages(path, numbers):
+    # Corre en un proceso del pool: cada uno abre el PDF por su cuenta
+    import pdfplumber
+    texts = []
+    with pdfplumber.open(path, pages=[number + 1 for number in numbers]) as pdf:
+        for page in pdf.pages:
+            texts.append(page.extract_text() or "")
+            page.close()
+    return texts
+
+
+def page_digest(page):
+    # Hash de los flujos de contenido de la página: la identifica sin
+    # necesidad de extraer su texto
+    import hashlib
+    from pdfminer.pdftypes import PDFStream, resolve1
+
+    digest = hashlib.sha1()
+    for stream in page.page_obj.contents:
+        stream = resolve1(stream)
+        if isinstance(stream, PDFStream):
+            digest.update(stream.get_data())
+    return digest.hexdigest()
+
+
+def extract_pdf_text(path, workers=1, cache=None):
+    return "".join(text for _, _, text in iter_pdf_pages(path, workers=workers, cache=cache))
+
+
+class TextWrapper:
+    # Corta párrafos al ancho disponible midiendo cada carácter una sola vez;
+    # las fuentes estándar no tienen kerning, así que el ancho de una palabra
+    # es la suma de los anchos de sus caracteres
+    def __init__(self, font_name, font_size, max_width):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        self.string_width = stringWidth
+        self.font_name = font_name
+        self.font_size = font_size
+        self.max_width = max_width
+        self.char_widths = {}
+        self.word_widths = {}
+        self.space_width = self.width(" ")
+
+    def char_width(self, char):
+        width = self.char_widths.get(char)
+        if width is None:
+            width = self.char_widths[char] = self.string_width(char, self.font_name, self.font_size)
+        return width
+
+    def width(self, word):
+        width = self.word_widths.get(word)
+        if width is None:
+            width = sum(self.char_width(char) for char in word)
+            if len(self.word_widths) < 100000:
+                self.word_widths[word] = width
+        return width
+
+    def wrap(self, paragraph):
+        lines = []
+        current = []
+        current_width = 0
+        for word in paragraph.split(" "):
+            word_width = self.width(word)
+            if current and current_width + self.space_width + word_width > self.max_width:
+                lines.append(" ".join(current))
+                current = []
+                current_width = 0
+            if word_width > self.max_width:
+                # Palabra más ancha que la línea: se corta por caracteres
+                for piece in self.split_long_word(word):
+                    lines.append(piece)
+                word = lines.pop()
+                word_width = self.width(word)
+            if current:
+                current_width += self.space_width
+            current.append(word)
+            current_width += word_width
+        lines.append(" ".join(current))
+        return lines
+
+    def split_long_word(self, word):
+        pieces = []
+        start = 0
+        width = 0
+        for i, char in enumerate(word):
+            char_width = self.char_width(char)
+            if i > start and width + char_width > self.max_width:
+                pieces.append(word[start:i])
+                start = i
+                width = 0
+            width += char_width
+        pieces.append(word[start:])
+        return pieces
+
+
+def export_text_to_pdf(text, path, progress=None):
+    # Cada página se arma en un solo objeto de texto y se dibuja de una vez,
+    # en lugar de una operación de dibujo por línea. text puede ser un str o
+    # un iterable de líneas sin su salto (para exportar sin armar el texto).
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(path, pagesize=letter)
+    width, height = letter
+    wrapper = TextWrapper(EXPORT_FONT, EXPORT_FONT_SIZE, width - 2 * EXPORT_MARGIN)
+    lines_per_page = int((height - 2 * EXPORT_MARGIN) // EXPORT_LEADING) + 1
+    pages = 0
+
+    def draw_page(lines):
+        text_object = c.beginText(EXPORT_MARGIN, height - EXPORT_MARGIN)
+        text_object.setFont(EXPORT_FONT, EXPORT_FONT_SIZE, EXPORT_LEADING)
+        text_object.textLines(lines, trim=0)
+        c.drawText(text_object)
+        c.showPage()
+
+    page_lines = []
+    paragraphs = text.split("\n") if isinstance(text, str) else text
+    for paragraph in paragraphs:
+        for line in wrapper.wrap(paragraph.replace("\t", "    ")):
+            page_lines.append(line)
+            if len(page_lines) == lines_per_page:
+                draw_page(page_lines)
+                page_lines = []
+                pages += 1
+                if progress is not None:
+                    progress(pages)
+    if page_lines or not pages:
+        draw_page(page_lines)
+        pages += 1
+        if progress is not None:
+            progress(pages)
+    c.save()
+    return pages
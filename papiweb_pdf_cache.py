@@ -0,0 +1,166 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".papiweb", "cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Caché persistente del texto extraído de cada página de PDF. Las páginas se
+# guardan por (hash del archivo, número de página) y además por un hash del
+# contenido de la página, así un archivo que cambió en parte sólo vuelve a
+# extraer las páginas distintas. Tamaño acotado con desalojo LRU.
+class PdfTextCache:
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "pdf_text.sqlite3")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # La importación corre en un hilo aparte del que creó la caché
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                file_hash TEXT PRIMARY KEY, pages INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                file_hash TEXT, page INTEGER, digest TEXT, text TEXT,
+                size INTEGER, last_used REAL,
+                PRIMARY KEY (file_hash, page)
+            );
+            CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest);
+            CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used);
+        """)
+
+    def has_path(self, path):
+        # Si ya se registró alguna versión del archivo (hay que preguntarlo
+        # antes de file_hash, que registra la actual)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT 1 FROM files WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+        return row is not None
+
+    def file_hash(self, path):
+        # Si tamaño y fecha de modificación coinciden con lo registrado se
+        # reutiliza el hash guardado sin volver a leer el archivo
+        path = os.path.abspath(path)
+        info = os.stat(path)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT size, mtime_ns, sha256 FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        if row and row[0] == info.st_size and row[1] == info.st_mtime_ns:
+            return row[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        file_hash = digest.hexdigest()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                (path, info.st_size, info.st_mtime_ns, file_hash),
+            )
+            self.db.commit()
+        return file_hash
+
+    def get_document(self, file_hash):
+        # Devuelve el texto de todas las páginas o None si falta alguna
+        with self.lock:
+            row = self.db.execute(
+                "SELECT pages FROM documents WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+            texts = [text for (text,) in self.db.execute(
+                "SELECT text FROM pages WHERE file_hash = ? ORDER BY page", (file_hash,)
+            )]
+            if len(texts) != row[0]:
+                return None
+            self.db.execute(
+                "UPDATE pages SET last_used = ? WHERE file_hash = ?", (time.time(), file_hash)
+            )
+            self.db.commit()
+        self.hits += len(texts)
+        return texts
+
+    def get_by_digests(self, digests):
+        found = {}
+        wanted = list(set(digests))
+        with self.lock:
+            for i in range(0, len(wanted), 500):
+                chunk = wanted[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for digest, text in self.db.execute(
+                    f"SELECT digest, text FROM pages WHERE digest IN ({marks})", chunk
+                ):
+                    found[digest] = text
+        return found
+
+    def start_document(self, file_hash, pages):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO documents VALUES (?, ?)", (file_hash, pages))
+
+    def put_page(self, file_hash, page, digest, text, extracted=True):
+        if extracted:
+            self.misses += 1
+        else:
+            self.hits += 1
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (file_hash, page, digest, text, len(text.encode("utf-8")), time.time()),
+            )
+
+    def flush(self):
+        with self.lock:
+            self.db.commit()
+            self._evict()
+            self.db.commit()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for rowid, size in self.db.execute("SELECT rowid, size FROM pages ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((rowid,))
+            total -= size
+        self.db.executemany("DELETE FROM pages WHERE rowid = ?", stale)
+
+    def stats(self):
+        with self.lock:
+            pages, size = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "pages": pages, "bytes": size}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+_default_cache = None
+
+
+def default_cache():
+    # La caché del usuario, compartida por el editor y la consola. Es
+    # opcional: si no se puede crear se devuelve None y se extrae siempre.
+    global _default_cache
+    if _default_cache is None:
+        try:
+            _default_cache = PdfTextCache()
+        except Exception:
+            return None
+    return _default_cache
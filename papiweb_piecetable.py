@@ -0,0 +1,242 @@
+import random
+from array import array
+from bisect import bisect_right
+
+from papiweb_io import CHUNK_CHARS
+
+# Textos fuente desde este largo tienen un índice por bloques, que se arma
+# la primera vez que hace falta ubicar una línea en ellos: cuántos saltos de
+# línea hay antes de cada bloque de BLOCK_CHARS caracteres. Se cuenta con
+# str.count por bloque, sin recorrer el texto línea por línea, y ubicar una
+# línea pasa a ser una búsqueda binaria más unas pocas dentro de un bloque.
+INDEX_MIN_CHARS = 64 * 1024
+BLOCK_CHARS = 16 * 1024
+
+
+class _Source:
+    # Un texto inmutable del que salen los trozos: el original o uno insertado
+    __slots__ = ("text", "_blocks")
+
+    def __init__(self, text):
+        self.text = text
+        self._blocks = None
+
+    def blocks(self):
+        if self._blocks is None:
+            text = self.text
+            counts = array("q", [0])
+            total = 0
+            for block in range(0, len(text), BLOCK_CHARS):
+                total += text.count("\n", block, block + BLOCK_CHARS)
+                counts.append(total)
+            self._blocks = counts
+        return self._blocks
+
+    def count(self, start, end):
+        return self.text.count("\n", start, end)
+
+    def find_newline(self, start, k):
+        # Posición del salto de línea número k (desde 0) a partir de start
+        text = self.text
+        if len(text) >= INDEX_MIN_CHARS:
+            blocks = self.blocks()
+            block = start // BLOCK_CHARS
+            # El salto buscado, contado desde el principio del texto
+            target = blocks[block] + text.count("\n", block * BLOCK_CHARS, start) + k
+            block = bisect_right(blocks, target) - 1
+            start = block * BLOCK_CHARS
+            k = target - blocks[block]
+        position = text.find("\n", start)
+        for _ in range(k):
+            position = text.find("\n", position + 1)
+        return position
+
+
+class _Node:
+    # Un trozo (source.text[start:start + length]) y los totales de su subárbol
+    __slots__ = ("source", "start", "length", "lines", "priority", "left", "right",
+                 "size", "newlines")
+
+    def __init__(self, source, start, length):
+        self.source = source
+        self.start = start
+        self.length = length
+        self.lines = source.count(start, start + length)
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.size = length
+        self.newlines = self.lines
+
+
+def _update(node):
+    node.size = node.length
+    node.newlines = node.lines
+    if node.left is not None:
+        node.size += node.left.size
+        node.newlines += node.left.newlines
+    if node.right is not None:
+        node.size += node.right.size
+        node.newlines += node.right.newlines
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+def _split(node, position):
+    # Devuelve (primeros position caracteres, resto); corta un trozo si hace falta
+    if node is None:
+        return None, None
+    left_size = node.left.size if node.left is not None else 0
+    if position <= left_size:
+        left, node.left = _split(node.left, position)
+        _update(node)
+        return left, node
+    if position >= left_size + node.length:
+        node.right, right = _split(node.right, position - left_size - node.length)
+        _update(node)
+        return node, right
+    offset = position - left_size
+    tail = _Node(node.source, node.start + offset, node.length - offset)
+    node.length = offset
+    node.lines = node.source.count(node.start, node.start + offset)
+    right = _merge(tail, node.right)
+    node.right = None
+    _update(node)
+    return node, right
+
+
+def _pieces(node, position=0):
+    # Recorrido en orden sin recursión (el árbol puede tener muchos trozos),
+    # desde el trozo que contiene position: se baja por el árbol hasta él en
+    # lugar de recorrer los anteriores. Genera (nodo, posición donde empieza).
+    stack = []
+    offset = 0
+    while node is not None:
+        start = offset + (node.left.size if node.left is not None else 0)
+        if position < start:
+            stack.append((node, start))
+            node = node.left
+        elif position >= start + node.length:
+            offset = start + node.length
+            node = node.right
+        else:
+            stack.append((node, start))
+            break
+    while stack:
+        node, start = stack.pop()
+        yield node, start
+        base = start + node.length
+        child = node.right
+        while child is not None:
+            stack.append((child, base + (child.left.size if child.left is not None else 0)))
+            child = child.left
+
+
+# Documento como tabla de trozos sobre un treap: cada nodo apunta a un rango
+# de un texto fuente inmutable y guarda el largo y los saltos de línea de su
+# subárbol. Insertar y borrar en una posición sólo corta y une árboles
+# (O(log n) esperado), sin copiar el documento; el texto se arma recién al
+# pedir un rango o al recorrerlo por bloques para guardarlo.
+class PieceTable:
+    def __init__(self, text=""):
+        self.root = None
+        if text:
+            self.root = _Node(_Source(text), 0, len(text))
+
+    def __len__(self):
+        return self.root.size if self.root is not None else 0
+
+    def line_count(self):
+        return (self.root.newlines if self.root is not None else 0) + 1
+
+    def insert(self, position, text):
+        if not text:
+            return
+        position = max(0, min(position, len(self)))
+        left, right = _split(self.root, position)
+        self.root = _merge(_merge(left, _Node(_Source(text), 0, len(text))), right)
+
+    def append(self, text):
+        self.insert(len(self), text)
+
+    def delete(self, start, end):
+        start = max(0, start)
+        end = min(end, len(self))
+        if start >= end:
+            return
+        left, rest = _split(self.root, start)
+        _, right = _split(rest, end - start)
+        self.root = _merge(left, right)
+
+    def line_offset(self, line):
+        # Posición donde empieza la línea (desde 0); la última línea + 1 da
+        # el largo del documento
+        if line <= 0:
+            return 0
+        if line >= self.line_count():
+            return len(self)
+        node = self.root
+        offset = 0
+        k = line - 1  # salto de línea buscado, desde 0
+        while node is not None:
+            left_lines = node.left.newlines if node.left is not None else 0
+            left_size = node.left.size if node.left is not None else 0
+            if k < left_lines:
+                node = node.left
+            elif k < left_lines + node.lines:
+                position = node.source.find_newline(node.start, k - left_lines)
+                return offset + left_size + position - node.start + 1
+            else:
+                k -= left_lines + node.lines
+                offset += left_size + node.length
+                node = node.right
+        return len(self)
+
+    def insert_at_line(self, line, text):
+        self.insert(self.line_offset(line), text)
+
+    def get_text(self, start=0, end=None):
+        end = len(self) if end is None else min(end, len(self))
+        if start >= end:
+            return ""
+        return "".join(self.iter_chunks(start, end))
+
+    def get_lines(self, first, count):
+        # Líneas first .. first + count - 1 (desde 0), con sus saltos de línea
+        return self.get_text(self.line_offset(first), self.line_offset(first + count))
+
+    def iter_chunks(self, start=0, end=None, size=CHUNK_CHARS):
+        # Bloques de a lo sumo size caracteres, en orden, del rango pedido
+        end = len(self) if end is None else end
+        for node, position in _pieces(self.root, start):
+            if position >= end:
+                break
+            first = max(start, position) - position
+            last = min(end, position + node.length) - position
+            text = node.source.text
+            for offset in range(node.start + first, node.start + last, size):
+                yield text[offset:min(offset + size, node.start + last)]
+
+    def iter_lines(self):
+        # Cada línea sin su salto, leyendo el documento por bloques
+        pending = ""
+        for chunk in self.iter_chunks():
+            lines = (pending + chunk).split("\n")
+            pending = lines.pop()
+            yield from lines
+        yield pending
+
+    def __str__(self):
+        return self.get_text()
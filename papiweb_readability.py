@@ -0,0 +1,229 @@
+import re
+
+# Métricas de legibilidad para español. La segmentación en oraciones se hace
+# con una expresión regular (los candidatos a fin de oración son pocos); el
+# conteo de sílabas y las estadísticas por palabra y por oración se calculan
+# con arreglos de NumPy sobre el texto completo, sin recorrerlo en Python.
+# NumPy se importa recién al calcular.
+
+# Abreviaturas frecuentes cuyo punto no cierra la oración
+ABBREVIATIONS = frozenset(
+    "sr sra srta sres sras dr dra dres lic ing arq prof profa etc ej pág págs art "
+    "núm nro tel av avda gral cap caps vol ed cía dto depto aprox máx mín ud uds "
+    "vd vds fig figs ee uu pp cf vs".split()
+)
+BOUNDARY_RE = re.compile(r"[.!?…]+|\n")
+# Primer carácter significativo después de un posible fin de oración; las
+# rayas de diálogo se saltean ("¿Vienes? —dijo" es una sola oración)
+NEXT_CHAR_RE = re.compile(r"[ \t\"'»”’)\]—–]*(.?)")
+PREVIOUS_WORD_RE = re.compile(r"(\w+)$")
+
+# Escala INFLESZ para el índice de Szigriszt-Pazos (límite inferior, grado)
+INFLESZ_SCALE = (
+    (80, "muy fácil"),
+    (65, "bastante fácil"),
+    (55, "normal"),
+    (40, "algo difícil"),
+    (float("-inf"), "muy difícil"),
+)
+
+# Metas de cada estilo de redacción: promedio de palabras por oración y
+# legibilidad mínima (Szigriszt-Pazos)
+STYLE_TARGETS = {
+    "secundaria": {"max_avg_sentence": 20, "min_score": 65},
+    "tecnico": {"max_avg_sentence": 25, "min_score": 50},
+    "universitario": {"min_avg_sentence": 10, "min_score": 40},
+}
+# Oraciones atípicas que se informan (las más largas y las más difíciles)
+OUTLIERS_TOP = 10
+# Las oraciones más cortas que esto no se consideran para las más difíciles
+HARD_MIN_WORDS = 5
+SENTENCE_BINS = (10, 20, 30, 40)
+
+# Clases de caracteres para el conteo de sílabas
+_OTHER, _CONSONANT, _WEAK, _STRONG = 0, 1, 2, 3
+_class_table = None
+
+
+def _classes():
+    # Tabla código -> clase para Latin-1 y Latin Extended; el último valor
+    # (clase "otro") cubre el resto de Unicode
+    global _class_table
+    if _class_table is None:
+        import numpy as np
+        table = np.zeros(0x250, dtype=np.uint8)
+        for code in range(0x250 - 1):
+            char = chr(code).lower()
+            if char in "iuü":
+                table[code] = _WEAK
+            elif char in "aeoáéíóúàèìòùïä":
+                # Las débiles con tilde forman hiato: cuentan como fuertes
+                table[code] = _STRONG
+            elif char.isalpha():
+                table[code] = _CONSONANT
+        _class_table = table
+    return _class_table
+
+
+def sentence_boundaries(text):
+    # Posiciones donde termina cada oración: signos de cierre y saltos de
+    # línea, salvo abreviaturas, iniciales, números decimales y puntos
+    # seguidos de minúscula o de otro signo ("etc., y...", "¿vienes? —dijo")
+    boundaries = []
+    for match in BOUNDARY_RE.finditer(text):
+        token = match.group()
+        position = match.start()
+        if token != "\n":
+            following = NEXT_CHAR_RE.match(text, match.end()).group(1)
+            if following and (following.islower() or following in ",;:"):
+                continue
+            if token == ".":
+                if 0 < position < len(text) - 1 and text[position - 1].isdigit() and following.isdigit():
+                    continue
+                previous = PREVIOUS_WORD_RE.search(text, max(0, position - 12), position)
+                if previous is not None:
+                    word = previous.group(1).lower()
+                    if word in ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                        continue
+        boundaries.append(position)
+    return boundaries
+
+
+def word_features(text):
+    # Devuelve (inicios, finales, sílabas) de cada palabra como arreglos.
+    # Sílabas: un núcleo por grupo de vocales, más uno por cada par de
+    # vocales fuertes seguidas (hiato). Los diptongos y triptongos con i/u
+    # átonas quedan en una sílaba; "qu"/"gu" no suman porque la u se une a
+    # la vocal siguiente.
+    import numpy as np
+    table = _classes()
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    classes = table[np.minimum(codes, len(table) - 1)]
+
+    letter = classes != _OTHER
+    vowel = classes >= _WEAK
+    strong = classes == _STRONG
+    previous_letter = np.concatenate(([False], letter[:-1]))
+    next_letter = np.concatenate((letter[1:], [False]))
+    previous_vowel = np.concatenate(([False], vowel[:-1]))
+    previous_strong = np.concatenate(([False], strong[:-1]))
+
+    word_start = letter & ~previous_letter
+    starts = np.flatnonzero(word_start)
+    ends = np.flatnonzero(letter & ~next_letter) + 1
+    if not len(starts):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    word_of_char = np.cumsum(word_start) - 1
+    nuclei = np.flatnonzero((vowel & ~previous_vowel) | (strong & previous_strong))
+    syllables = np.bincount(word_of_char[nuclei], minlength=len(starts))
+    # Palabras sin vocales ("y", siglas): una sílaba
+    return starts, ends, np.maximum(syllables, 1)
+
+
+def inflesz_grade(score):
+    for limit, grade in INFLESZ_SCALE:
+        if score >= limit:
+            return grade
+    return INFLESZ_SCALE[-1][1]
+
+
+def readability_stats(text):
+    import numpy as np
+
+    starts, ends, syllables = word_features(text)
+    words = len(starts)
+    if not words:
+        return None
+    boundaries = np.asarray(sentence_boundaries(text), dtype=np.int64)
+    # Oración de cada palabra: cuántos fines de oración hay antes de ella
+    sentence_of_word = np.searchsorted(boundaries, starts, side="right")
+    first_words = np.flatnonzero(np.diff(sentence_of_word, prepend=-1))
+    last_words = np.append(first_words[1:] - 1, words - 1)
+    sentence_words = np.diff(np.append(first_words, words))
+    sentence_syllables = np.add.reduceat(syllables, first_words)
+    sentences = len(first_words)
+
+    total_syllables = int(syllables.sum())
+    syllables_per_word = total_syllables / words
+    words_per_sentence = words / sentences
+    szigriszt = 206.835 - 62.3 * syllables_per_word - words_per_sentence
+    fernandez_huerta = 206.84 - 60 * syllables_per_word - 1.02 * words_per_sentence
+
+    # Oraciones atípicamente largas: por encima de Q3 + 1,5 * rango intercuartil
+    q1, median, q3 = np.percentile(sentence_words, (25, 50, 75))
+    long_limit = q3 + 1.5 * (q3 - q1)
+    long_order = np.argsort(-sentence_words, kind="stable")
+    long_order = long_order[sentence_words[long_order] > long_limit]
+
+    # Las más difíciles según Szigriszt-Pazos calculado por oración
+    sentence_scores = (206.835 - 62.3 * sentence_syllables / sentence_words - sentence_words)
+    candidates = np.flatnonzero(sentence_words >= HARD_MIN_WORDS)
+    hard_order = candidates[np.argsort(sentence_scores[candidates], kind="stable")][:OUTLIERS_TOP]
+
+    def spans(order, values):
+        return [(int(starts[first_words[i]]), int(ends[last_words[i]]), values[i]) for i in order]
+
+    bins = np.searchsorted(np.asarray(SENTENCE_BINS), sentence_words, side="left")
+    bin_counts = np.bincount(bins, minlength=len(SENTENCE_BINS) + 1)
+    bin_labels = [f"1-{SENTENCE_BINS[0]}"]
+    bin_labels += [f"{low + 1}-{high}" for low, high in zip(SENTENCE_BINS, SENTENCE_BINS[1:])]
+    bin_labels.append(f"{SENTENCE_BINS[-1] + 1}+")
+    syllable_counts = np.bincount(np.minimum(syllables, 4), minlength=5)
+
+    return {
+        "words": words,
+        "sentences": sentences,
+        "syllables": total_syllables,
+        "avg_sentence_length": words_per_sentence,
+        "avg_syllables_per_word": syllables_per_word,
+        "fernandez_huerta": float(fernandez_huerta),
+        "szigriszt_pazos": float(szigriszt),
+        "inflesz": inflesz_grade(szigriszt),
+        "sentence_length_percentiles": {
+            str(p): float(v) for p, v in zip((10, 25, 50, 75, 90),
+                                             np.percentile(sentence_words, (10, 25, 50, 75, 90)))
+        },
+        "sentence_length_histogram": dict(zip(bin_labels, bin_counts.tolist())),
+        "syllable_histogram": {"1": int(syllable_counts[1]), "2": int(syllable_counts[2]),
+                               "3": int(syllable_counts[3]), "4+": int(syllable_counts[4])},
+        "long_sentence_limit": float(long_limit),
+        "long_sentence_count": len(long_order),
+        # (inicio, fin, palabras) y (inicio, fin, puntaje) en posiciones del texto
+        "long_sentences": spans(long_order[:OUTLIERS_TOP], sentence_words.tolist()),
+        "hard_sentences": spans(hard_order, [round(float(s), 1) for s in sentence_scores]),
+    }
+
+
+def optional_readability_stats(text):
+    # NumPy es opcional: sin él no hay métricas de legibilidad
+    try:
+        return readability_stats(text)
+    except ImportError:
+        return None
+
+
+def style_advice(writing_style, avg_sentence_length, readability=None):
+    # Observaciones de legibilidad para el estilo elegido. Sin métricas
+    # (readability None) se usa el promedio de palabras de analyze_text.
+    targets = STYLE_TARGETS.get(writing_style, {})
+    advice = []
+    if readability is not None:
+        avg_sentence_length = readability["avg_sentence_length"]
+        advice.append(f"Legibilidad (Szigriszt-Pazos): {readability['szigriszt_pazos']:.0f}, "
+                      f"{readability['inflesz']} · Fernández-Huerta: "
+                      f"{readability['fernandez_huerta']:.0f}")
+    if avg_sentence_length > targets.get("max_avg_sentence", float("inf")):
+        advice.append("Las oraciones son muy largas. Intenta hacerlas más cortas y simples.")
+    elif avg_sentence_length < targets.get("min_avg_sentence", 0):
+        advice.append("Las oraciones son muy cortas. Intenta desarrollar más las ideas.")
+    if readability is None:
+        return advice
+    if readability["szigriszt_pazos"] < targets.get("min_score", float("-inf")):
+        advice.append(f"El texto resulta {readability['inflesz']} para este estilo: "
+                      f"prueba con palabras más cortas y oraciones más simples.")
+    if readability["long_sentence_count"]:
+        advice.append(f"{readability['long_sentence_count']} oración(es) superan las "
+                      f"{readability['long_sentence_limit']:.0f} palabras "
+                      f"(la más larga tiene {readability['long_sentences'][0][2]}).")
+    return advice
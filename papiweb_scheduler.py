@@ -0,0 +1,47 @@
+# Planificador de análisis del editor: cada trabajo tiene un nombre
+# ("spelling", "stats", "style") y programar uno que ya estaba pendiente
+# cancela el anterior, así una ráfaga de teclas termina en una sola ejecución.
+class AnalysisScheduler:
+    def __init__(self, root):
+        self.root = root
+        self.pending = {}  # nombre -> id devuelto por after/after_idle
+        self.scheduled = 0
+        self.dropped = 0
+        self.executed = 0
+
+    def schedule(self, name, callback, delay=300, idle=False):
+        self.cancel(name)
+        if idle:
+            # Los trabajos de baja prioridad esperan además a que Tk esté ocioso
+            job = lambda: self._defer_to_idle(name, callback)
+        else:
+            job = lambda: self._run(name, callback)
+        self.pending[name] = self.root.after(delay, job)
+        self.scheduled += 1
+
+    def cancel(self, name=None):
+        names = list(self.pending) if name is None else [name]
+        for key in names:
+            after_id = self.pending.pop(key, None)
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+                self.dropped += 1
+
+    def is_pending(self, name):
+        return name in self.pending
+
+    def stats(self):
+        return {
+            "scheduled": self.scheduled,
+            "dropped": self.dropped,
+            "executed": self.executed,
+            "pending": len(self.pending),
+        }
+
+    def _defer_to_idle(self, name, callback):
+        self.pending[name] = self.root.after_idle(lambda: self._run(name, callback))
+
+    def _run(self, name, callback):
+        self.pending.pop(name, None)
+        self.executed += 1
+        callback()
@@ -0,0 +1,47 @@
+import re
+
+# Búsqueda y reemplazo sobre el texto completo, para el editor y la consola.
+# Trabaja sobre un str (una copia del documento) y devuelve posiciones de
+# carácter: quien la usa decide cómo mostrarlas o aplicarlas.
+class SearchQuery:
+    def __init__(self, query, regex=False, ignore_case=False):
+        # En modo literal la consulta se escapa; re.error indica una
+        # expresión regular inválida
+        self.query = query
+        self.regex = regex
+        self.ignore_case = ignore_case
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        self.pattern = re.compile(query if regex else re.escape(query), flags)
+
+    def find_all(self, text):
+        # (inicio, fin) de cada coincidencia; las vacías (p. ej. "x*") no cuentan
+        return [match.span() for match in self.pattern.finditer(text)
+                if match.end() > match.start()]
+
+    def replace_all(self, text, replacement):
+        # Devuelve (texto nuevo, reemplazos, inicio de la primera coincidencia,
+        # fin de la última). Entre esas dos posiciones está todo lo que
+        # cambió: el editor aplica sólo ese tramo en una única edición.
+        # En modo regex replacement admite \1, \g<nombre>, etc.
+        if not self.regex and not self.ignore_case:
+            # Literal y con mayúsculas exactas: str.replace es mucho más rápido
+            count = text.count(self.query)
+            if not count:
+                return text, 0, None, None
+            first = text.find(self.query)
+            last = text.rfind(self.query) + len(self.query)
+            return text.replace(self.query, replacement), count, first, last
+
+        spans = []
+        expand = self.regex and "\\" in replacement
+
+        def substitute(match):
+            if match.end() == match.start():
+                return ""
+            spans.append(match.span())
+            return match.expand(replacement) if expand else replacement
+
+        new_text = self.pattern.sub(substitute, text)
+        if not spans:
+            return text, 0, None, None
+        return new_text, len(spans), spans[0][0], spans[-1][1]
@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+
+# Perfil de arranque (--startup-profile): cuánto tarda cada import, propio y
+# acumulado como en "python -X importtime" (que no se puede usar en los
+# ejecutables de PyInstaller), y cuánto se tarda en mostrar el primer cuadro.
+FLAG = "--startup-profile"
+REPORT_PATH = os.path.join(os.path.expanduser("~"), ".papiweb", "startup_profile.txt")
+# Imports que se listan en el informe, de mayor a menor tiempo acumulado
+REPORT_TOP = 30
+
+_profiler = None
+
+
+class _TimedLoader:
+    # Envuelve al loader real sólo mientras se carga el módulo
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        # Los módulos de extensión hacen casi todo su trabajo acá
+        create_module = getattr(self.loader, "create_module", None)
+        if create_module is None:
+            return None
+        self.profiler.enter(spec.name)
+        try:
+            return create_module(spec)
+        finally:
+            self.profiler.leave(spec.name)
+
+    def exec_module(self, module):
+        self.profiler.enter(module.__name__)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler.leave(module.__name__)
+            module.__loader__ = self.loader
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = self.loader
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stack = []
+        self.imports = {}   # módulo -> [propio, acumulado] en segundos
+        self.marks = []
+
+    # Buscador de sys.meta_path: delega en los demás y envuelve el loader
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def enter(self, name):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self, name):
+        name, started, children = self.stack.pop()
+        total = time.perf_counter() - started
+        if self.stack:
+            self.stack[-1][2] += total
+        timing = self.imports.setdefault(name, [0.0, 0.0])
+        timing[0] += total - children
+        timing[1] += total
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def report(self):
+        lines = ["Perfil de arranque de Papiweb Editor", ""]
+        for label, elapsed in self.marks:
+            lines.append(f"{label:<32} {elapsed * 1000:9.1f} ms")
+        total = sum(timing[0] for timing in self.imports.values())
+        lines += ["", f"Imports: {len(self.imports)} módulos, {total * 1000:.1f} ms en total", "",
+                  f"{'propio (ms)':>12} {'acumulado (ms)':>15}  módulo"]
+        ranked = sorted(self.imports.items(), key=lambda item: -item[1][1])
+        for name, (own, cumulative) in ranked[:REPORT_TOP]:
+            lines.append(f"{own * 1000:12.1f} {cumulative * 1000:15.1f}  {name}")
+        return "\n".join(lines)
+
+
+def start(argv=None):
+    # Se llama antes de los demás imports del programa; si no se pidió el
+    # perfil no hace nada
+    global _profiler
+    argv = sys.argv if argv is None else argv
+    if FLAG in argv and _profiler is None:
+        _profiler = StartupProfiler()
+        sys.meta_path.insert(0, _profiler)
+    return _profiler
+
+
+def active():
+    return _profiler is not None
+
+
+def mark(label):
+    if _profiler is not None:
+        _profiler.mark(label)
+
+
+def finish(label):
+    # Registra el último hito, deja de medir y publica el informe en stderr
+    # (si hay consola) y en ~/.papiweb/startup_profile.txt. Devuelve el
+    # tiempo total en segundos.
+    global _profiler
+    if _profiler is None:
+        return None
+    _profiler.mark(label)
+    elapsed = _profiler.marks[-1][1]
+    if _profiler in sys.meta_path:
+        sys.meta_path.remove(_profiler)
+    text = _profiler.report()
+    _profiler = None
+    if sys.stderr is not None:
+        print(text, file=sys.stderr)
+    try:
+        os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+        with open(REPORT_PATH, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    except OSError:
+        pass
+    return elapsed
@@ -0,0 +1,53 @@
+# Estilos de redacción que comparten el editor, la consola y el análisis.
+# "phrases" son las frases que el estilo sugiere revisar, con la alternativa
+# propuesta: el análisis arma con ellas un solo autómata por estilo, así que
+# la lista puede crecer a miles de entradas sin volver más lento el análisis.
+WRITING_STYLES = {
+    "secundaria": {
+        "name": "Estudiante Secundario BA",
+        "phrases": {
+            "utilizar": "usar",
+            "efectuar": "hacer",
+            "realizar": "hacer",
+            "obstante": "pero",
+            "por consiguiente": "entonces",
+            "por ende": "entonces"
+        },
+        "message": "Considera cambiar '{}' por algo más simple, como '{}'",
+        "suggestions": {
+            "conectores": ["entonces", "después", "también", "pero", "y", "o", "porque"],
+            "tone": "informal_juvenil"
+        }
+    },
+    "tecnico": {
+        "name": "Desarrollador Técnico",
+        "phrases": {
+            "programa": "aplicación/software",
+            "hacer": "implementar/desarrollar",
+            "arreglar": "debuggear/resolver",
+            "cosa": "componente/módulo",
+            "problema": "bug/issue"
+        },
+        "message": "'{}' podría ser más específico técnicamente ({})",
+        "suggestions": {
+            "conectores": ["por lo tanto", "además", "sin embargo", "en consecuencia", "dado que"],
+            "tone": "tecnico_preciso"
+        }
+    },
+    "universitario": {
+        "name": "Nivel Universitario",
+        "phrases": {
+            "muy bueno": "excelente",
+            "malo": "deficiente",
+            "está bien": "es adecuado",
+            "pensar": "considerar/analizar",
+            "decir": "expresar/manifestar",
+            "ver": "observar/analizar"
+        },
+        "message": "'{}' podría expresarse de forma más académica ({})",
+        "suggestions": {
+            "conectores": ["no obstante", "por consiguiente", "asimismo", "en virtud de", "en este sentido"],
+            "tone": "academico_formal"
+        }
+    }
+}
@@ -0,0 +1,233 @@
+import gzip
+import hashlib
+import marshal
+import os
+import sys
+
+from papiweb_analysis import WORD_RE
+
+# Sugerencias de corrección para palabras que no están en la lista del
+# español. Son para la revisión manual, no para cada tecla: una consulta
+# nueva tarda de décimas de milisegundo a unos 12 ms en Python puro (las
+# palabras cortas con muchas vecinas son las más caras), y las repetidas
+# salen de la memoria de consultas ya hechas.
+
+# Lista de palabras incluida (en los ejecutables de PyInstaller queda en _MEIPASS)
+DATA_DIR = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+WORDLIST_PATH = os.path.join(DATA_DIR, "palabras_es.txt.gz")
+INDEX_DIR = os.path.join(os.path.expanduser("~"), ".papiweb", "cache")
+
+MAX_DISTANCE = 2
+# Sólo se generan borrados sobre este prefijo de cada palabra: el índice
+# ocupa mucho menos y la distancia se calcula igual sobre la palabra completa
+PREFIX_LENGTH = 6
+INDEX_VERSION = 1
+
+
+def read_wordlist(path=WORDLIST_PATH):
+    # Una palabra por línea, opcionalmente seguida de su frecuencia
+    opener = gzip.open if path.endswith(".gz") else open
+    words = {}
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            parts = line.split()
+            words[parts[0].lower()] = int(parts[1]) if len(parts) > 1 else 1
+    return words
+
+
+def _deletes(word, max_distance):
+    found = {word}
+    frontier = [word]
+    for _ in range(max_distance):
+        following = []
+        for candidate in frontier:
+            for i in range(len(candidate)):
+                delete = candidate[:i] + candidate[i + 1:]
+                if delete not in found:
+                    found.add(delete)
+                    following.append(delete)
+        frontier = following
+    return found
+
+
+def edit_distance(a, b, max_distance):
+    # Damerau-Levenshtein restringida (transposiciones adyacentes). Devuelve
+    # max_distance + 1 si se pasa del máximo, sin terminar la tabla.
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    # Las candidatas suelen compartir principio y final con la palabra: se
+    # recortan antes de armar la tabla
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return len(a) or len(b)
+
+    # Sólo hace falta la franja de la tabla con |i - j| <= max_distance
+    limit = max_distance + 1
+    previous_previous = None
+    previous = [j if j < limit else limit for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [limit] * (len(b) + 1)
+        current[0] = i if i < limit else limit
+        row_min = current[0]
+        char = a[i - 1]
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            value = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if (previous_previous is not None and j > 1 and char == b[j - 2]
+                    and a[i - 2] == b[j - 1] and previous_previous[j - 2] + 1 < value):
+                value = previous_previous[j - 2] + 1
+            if value > limit:
+                value = limit
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return limit
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+# Motor de sugerencias estilo SymSpell: cada palabra de la lista se indexa por
+# todas las variantes que resultan de borrarle hasta MAX_DISTANCE letras, así
+# una consulta sólo genera los borrados de la palabra buscada y compara contra
+# unas pocas candidatas en lugar de recorrer el diccionario entero.
+class SpellingSuggester:
+    def __init__(self, words, deletes, max_distance=MAX_DISTANCE, prefix_length=PREFIX_LENGTH):
+        # words: palabra -> frecuencia. deletes: borrado -> palabras separadas
+        # por "\n" (un solo str por entrada se guarda y se carga mucho más
+        # rápido que una lista)
+        self.words = words
+        self.deletes = deletes
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.memo = {}
+
+    @classmethod
+    def build(cls, words, max_distance=MAX_DISTANCE, prefix_length=PREFIX_LENGTH):
+        deletes = {}
+        for word in words:
+            for delete in _deletes(word[:prefix_length], max_distance):
+                entry = deletes.get(delete)
+                if entry is None:
+                    deletes[delete] = [word]
+                else:
+                    entry.append(word)
+        for delete, entry in deletes.items():
+            deletes[delete] = "\n".join(entry)
+        return cls(words, deletes, max_distance, prefix_length)
+
+    def __contains__(self, word):
+        return word.lower() in self.words
+
+    def __len__(self):
+        return len(self.words)
+
+    def lookup(self, word, top=5):
+        # Devuelve hasta top tuplas (sugerencia, distancia), primero las más
+        # cercanas y, a igual distancia, las más frecuentes
+        word = word.lower()
+        key = (word, top)
+        if key in self.memo:
+            return self.memo[key]
+        if word in self.words:
+            return [(word, 0)]
+
+        max_distance = self.max_distance
+        prefix = word[:self.prefix_length]
+        found = {}
+        considered = {word}
+        seen_deletes = {prefix}
+        frontier = [prefix]
+        for level in range(max_distance + 1):
+            # Toda sugerencia a distancia d aparece entre los borrados de nivel
+            # <= d: si ya hay top sugerencias a distancia < level, los niveles
+            # siguientes (los de listas más largas) no pueden mejorarlas
+            if sum(1 for distance in found.values() if distance < level) >= top:
+                break
+            following = []
+            for candidate in frontier:
+                entry = self.deletes.get(candidate)
+                if entry is not None:
+                    for suggestion in entry.split("\n"):
+                        if suggestion in considered:
+                            continue
+                        considered.add(suggestion)
+                        if abs(len(suggestion) - len(word)) > max_distance:
+                            continue
+                        distance = edit_distance(word, suggestion, max_distance)
+                        if distance <= max_distance:
+                            found[suggestion] = distance
+                            # Con top sugerencias a distancia d, las que estén
+                            # más lejos ya no entran: se acota la búsqueda
+                            if len(found) >= top:
+                                max_distance = sorted(found.values())[top - 1]
+                if level < max_distance:
+                    for i in range(len(candidate)):
+                        delete = candidate[:i] + candidate[i + 1:]
+                        if delete not in seen_deletes:
+                            seen_deletes.add(delete)
+                            following.append(delete)
+            frontier = following
+
+        ranked = sorted(found.items(), key=lambda item: (item[1], -self.words[item[0]], item[0]))
+        result = ranked[:top]
+        if len(self.memo) >= 50000:
+            self.memo.clear()
+        self.memo[key] = result
+        return result
+
+
+def load_suggester(path=WORDLIST_PATH):
+    # Armar el índice lleva varios segundos; se guarda con marshal en la caché
+    # y los arranques siguientes sólo lo leen
+    with open(path, "rb") as f:
+        source = hashlib.sha256(f.read())
+    source.update(repr((INDEX_VERSION, MAX_DISTANCE, PREFIX_LENGTH)).encode())
+    index_path = os.path.join(INDEX_DIR, f"sugerencias-{source.hexdigest()[:16]}.bin")
+    try:
+        with open(index_path, "rb") as f:
+            words, deletes = marshal.load(f)
+        return SpellingSuggester(words, deletes)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    suggester = SpellingSuggester.build(read_wordlist(path))
+    try:
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            marshal.dump((suggester.words, suggester.deletes), f)
+        os.replace(temp_path, index_path)
+    except OSError:
+        pass
+    return suggester
+
+
+def find_unknown_words(text, suggester, known=None):
+    # Palabras que no están en la lista ni en el diccionario de errores. Se
+    # saltean números y palabras con mayúscula inicial (nombres propios); las
+    # sugerencias se piden aparte sólo para las que se van a mostrar.
+    # Devuelve (inicio, fin, palabra).
+    unknown = []
+    words = suggester.words
+    for match in WORD_RE.finditer(text):
+        token = match.group()
+        if token[0].isupper() or not token.isalpha():
+            continue
+        word = token.lower()
+        if word in words or (known is not None and word in known):
+            continue
+        unknown.append((match.start(), match.end(), token))
+    return unknown
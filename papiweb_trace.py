@@ -0,0 +1,93 @@
+import json
+import os
+import time
+from collections import deque
+
+# Instrumentación opcional de los manejadores del editor. Se activa con la
+# variable de entorno PAPIWEB_TRACE=1 o desde el menú Herramientas; apagada,
+# cada llamada sólo paga una comparación.
+TRACE_ENV = "PAPIWEB_TRACE"
+TRACE_PATH = os.path.join(os.path.expanduser("~"), ".papiweb", "trace.jsonl")
+# Al pasar este tamaño el archivo se renombra a trace.jsonl.1
+MAX_TRACE_BYTES = 10 * 1024 * 1024
+# Mediciones recientes por manejador que se usan para los percentiles
+WINDOW = 200
+# Eventos que se acumulan en memoria antes de escribirlos al archivo
+FLUSH_EVERY = 50
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Tracer:
+    def __init__(self, path=TRACE_PATH, enabled=False):
+        self.path = path
+        self.enabled = enabled
+        self.session = f"{os.getpid()}-{int(time.time())}"
+        self.samples = {}   # manejador -> deque con los últimos tiempos (s)
+        self.counts = {}
+        self.pending = []
+
+    def wrap(self, name, function, size=None):
+        # Devuelve un reemplazo de function que mide cada llamada mientras la
+        # traza está activa; size() da el tamaño del documento en ese momento
+        def traced(*args, **kwargs):
+            if not self.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start, size() if size else None)
+        traced.__name__ = getattr(function, "__name__", name)
+        return traced
+
+    def record(self, name, seconds, size=None, **extra):
+        if not self.enabled:
+            return
+        self.samples.setdefault(name, deque(maxlen=WINDOW)).append(seconds)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        event = {"ts": round(time.time(), 3), "session": self.session, "event": name,
+                 "ms": round(seconds * 1000, 3), "size": size, "count": self.counts[name]}
+        event.update(extra)
+        self.pending.append(event)
+        if len(self.pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def latencies(self, name):
+        # (p50, p95) en segundos sobre las últimas WINDOW llamadas
+        values = sorted(self.samples.get(name, ()))
+        return percentile(values, 0.5), percentile(values, 0.95)
+
+    def summary(self, top=3):
+        # Los manejadores con peor p95, en formato corto para la barra de estado
+        ranked = sorted(self.samples, key=lambda name: self.latencies(name)[1], reverse=True)
+        parts = []
+        for name in ranked[:top]:
+            p50, p95 = self.latencies(name)
+            parts.append(f"{name} {p50 * 1000:.1f}/{p95 * 1000:.1f}")
+        return "p50/p95 ms: " + " · ".join(parts) if parts else "Traza activa"
+
+    def set_enabled(self, enabled):
+        if not enabled:
+            self.flush()
+        self.enabled = enabled
+
+    def flush(self):
+        if not self.pending:
+            return
+        lines = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in self.pending)
+        self.pending = []
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) > MAX_TRACE_BYTES:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError:
+            # La traza nunca debe interrumpir al editor
+            pass
@@ -0,0 +1,153 @@
+import sys
+import zlib
+from collections import deque
+
+# Memoria máxima del historial de deshacer; al pasarla se descartan las
+# entradas más viejas
+DEFAULT_UNDO_BUDGET = 64 * 1024 * 1024
+# Los textos de al menos este largo se guardan comprimidos
+COMPRESS_MIN_CHARS = 4096
+
+
+# Un cambio del buffer: "insert" o "delete" de text a partir de index (índice
+# Tk "línea.columna"). end es el índice posterior al texto: después de
+# insertar, o antes de borrar.
+class Delta:
+    __slots__ = ("kind", "index", "end", "payload", "compressed", "length")
+
+    def __init__(self, kind, index, end, text):
+        self.kind = kind
+        self.index = index
+        self.end = end
+        self.length = len(text)
+        self.compressed = len(text) >= COMPRESS_MIN_CHARS
+        self.payload = zlib.compress(text.encode("utf-8"), 1) if self.compressed else text
+
+    @property
+    def text(self):
+        return zlib.decompress(self.payload).decode("utf-8") if self.compressed else self.payload
+
+    def size(self):
+        return sys.getsizeof(self.payload) + 64
+
+    def merge(self, kind, index, end, text):
+        # Agrupa el tipeo (o los borrados) consecutivos en una sola entrada
+        if self.compressed or kind != self.kind or "\n" in text:
+            return False
+        if kind == "insert":
+            previous = self.payload[-1:]
+            if index != self.end or (previous.isspace() and not text.isspace()):
+                return False
+            self.payload += text
+            self.end = end
+        elif end == self.index:
+            # Retroceso: el texto borrado queda antes del anterior
+            self.payload = text + self.payload
+            self.index = index
+        elif index == self.index:
+            # Suprimir: el texto borrado queda después
+            self.payload += text
+        else:
+            return False
+        self.length = len(self.payload)
+        return True
+
+
+class UndoHistory:
+    def __init__(self, budget=DEFAULT_UNDO_BUDGET):
+        self.budget = budget
+        self.undo_stack = deque()   # entradas: listas de Delta en orden de aplicación
+        self.redo_stack = []
+        self.bytes = 0
+        self.group = None
+        self.group_depth = 0
+        self.paused = 0
+        # Si la próxima edición puede sumarse a la última entrada
+        self.mergeable = False
+
+    @property
+    def recording(self):
+        return not self.paused
+
+    def pause(self):
+        self.paused += 1
+
+    def resume(self):
+        self.paused -= 1
+
+    def begin_group(self):
+        # Todo lo registrado hasta end_group se deshace de una vez
+        if self.group_depth == 0:
+            self.group = []
+        self.group_depth += 1
+
+    def end_group(self):
+        if self.group_depth == 0:
+            return
+        self.group_depth -= 1
+        if self.group_depth == 0:
+            group, self.group = self.group, None
+            if group:
+                self._push(group)
+
+    def record(self, kind, index, end, text):
+        if self.paused or not text:
+            return
+        if self.redo_stack:
+            self.bytes -= sum(_entry_size(entry) for entry in self.redo_stack)
+            self.redo_stack.clear()
+        if self.group is not None:
+            self.group.append(Delta(kind, index, end, text))
+            return
+        if self.mergeable and self.undo_stack and len(self.undo_stack[-1]) == 1:
+            last = self.undo_stack[-1][0]
+            before = last.size()
+            if last.merge(kind, index, end, text):
+                self.bytes += last.size() - before
+                self._evict()
+                return
+        self._push([Delta(kind, index, end, text)])
+        self.mergeable = True
+
+    def _push(self, entry):
+        self.undo_stack.append(entry)
+        self.bytes += _entry_size(entry)
+        self.mergeable = False
+        self._evict()
+
+    def _evict(self):
+        while self.bytes > self.budget and self.redo_stack:
+            self.bytes -= _entry_size(self.redo_stack.pop(0))
+        while self.bytes > self.budget and self.undo_stack:
+            self.bytes -= _entry_size(self.undo_stack.popleft())
+
+    def pop_undo(self):
+        self.mergeable = False
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        return entry
+
+    def pop_redo(self):
+        self.mergeable = False
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        return entry
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.bytes = 0
+        self.mergeable = False
+        self.group = [] if self.group_depth else None
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self._evict()
+
+
+def _entry_size(entry):
+    return sum(delta.size() for delta in entry)
@@ -0,0 +1,79 @@
+import queue
+
+from papiweb_analysis import analyze_text
+
+# Desde este tamaño el análisis corre en un proceso aparte: en un hilo
+# competiría con Tk por el GIL y la ventana dejaría de responder con fluidez
+PROCESS_MIN_CHARS = 500000
+
+
+def analyze_document(text, spelling_errors, writing_style):
+    # analyze_text más las métricas de legibilidad (None sin NumPy)
+    from papiweb_readability import optional_readability_stats
+    analysis = analyze_text(text, spelling_errors, writing_style)
+    analysis["readability"] = optional_readability_stats(text)
+    return analysis
+
+
+# Corre analyze_document fuera del hilo de Tk sobre una copia del texto. Los
+# resultados vuelven por una cola que el editor revisa con after(); cada
+# trabajo lleva la clave (revisión del buffer, estilo, ...) con la que se pidió,
+# así quien lo recibe puede descartarlo si el texto ya cambió.
+class AnalysisWorker:
+    def __init__(self, process_min_chars=PROCESS_MIN_CHARS):
+        self.process_min_chars = process_min_chars
+        self.results = queue.Queue()
+        self.thread_pool = None
+        self.process_pool = None
+        self.busy = False
+        self.submitted = 0
+        self.stale = 0
+
+    def _pool(self, size):
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        if size >= self.process_min_chars and self.process_pool is not False:
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor(max_workers=1)
+            return self.process_pool
+        if self.thread_pool is None:
+            self.thread_pool = ThreadPoolExecutor(max_workers=1)
+        return self.thread_pool
+
+    def submit(self, key, text, spelling_errors, writing_style):
+        # Un trabajo a la vez: quien pide otro mientras hay uno en curso
+        # espera el resultado y decide si le sirve
+        pool = self._pool(len(text))
+        try:
+            future = pool.submit(analyze_document, text, spelling_errors, writing_style)
+        except (OSError, RuntimeError):
+            if pool is not self.process_pool:
+                raise
+            # Sin procesos disponibles se usa siempre el hilo
+            self.process_pool = False
+            future = self._pool(len(text)).submit(analyze_document, text, spelling_errors,
+                                                  writing_style)
+        self.busy = True
+        self.submitted += 1
+        future.add_done_callback(lambda done: self.results.put((key, text, done)))
+
+    def poll(self):
+        # Devuelve (clave, texto, análisis) si terminó el trabajo, o None.
+        # Los errores del análisis se propagan a quien llama.
+        try:
+            key, text, future = self.results.get_nowait()
+        except queue.Empty:
+            return None
+        self.busy = False
+        try:
+            return key, text, future.result()
+        except Exception as e:
+            from concurrent.futures.process import BrokenProcessPool
+            if isinstance(e, BrokenProcessPool):
+                # El proceso murió (p. ej. sin memoria): se sigue con el hilo
+                self.process_pool = False
+            raise
+
+    def shutdown(self):
+        for pool in (self.thread_pool, self.process_pool):
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)